@@ -12,6 +12,7 @@ setup(
         "google-api-python-client>=2.89.0",
         "google-auth-httplib2>=0.1.0",
         "pandas>=2.0.3",
+        "numpy>=1.26.0",
         "openpyxl>=3.1.2",
         "Pillow>=10.0.0",
         "python-dotenv>=1.0.0",
@@ -3,33 +3,69 @@ Google Drive authentication module
 """
 
 import os
-import pickle
+import functools
+from datetime import datetime, timedelta
+from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 
 # Define the scopes
 SCOPES = ['https://www.googleapis.com/auth/drive']
-TOKEN_PICKLE_FILE = 'token.pickle'
+TOKEN_FILE = 'token.json'
 CREDENTIALS_FILE = os.path.join('drive_json', 'credentials.json')
 
+# Refresh proactively when less than this remains before expiry, so
+# credentials don't expire mid-run and stall workers on 401 retries
+REFRESH_WINDOW = timedelta(minutes=5)
+
+def _save_token(credentials):
+    """
+    Persist credentials atomically (write to a temp file, then rename)
+
+    Args:
+        credentials: Google API credentials
+    """
+    temp_path = TOKEN_FILE + '.tmp'
+    with open(temp_path, 'w') as token:
+        token.write(credentials.to_json())
+    os.replace(temp_path, TOKEN_FILE)
+
+def _expires_soon(credentials):
+    """
+    Check whether credentials are close to expiring
+
+    Args:
+        credentials: Google API credentials
+
+    Returns:
+        bool: True if the credentials expire within the refresh window
+    """
+    if not credentials.expiry:
+        return False
+    return credentials.expiry - datetime.utcnow() < REFRESH_WINDOW
+
+@functools.lru_cache(maxsize=1)
 def authenticate():
     """
     Authenticate with Google Drive API
-    
+
+    The parsed credential object is memoized per process, so repeated
+    calls don't re-read the token file.
+
     Returns:
         Credentials: Google API credentials
     """
     credentials = None
-    
-    # The file token.pickle stores the user's access and refresh tokens
-    if os.path.exists(TOKEN_PICKLE_FILE):
-        with open(TOKEN_PICKLE_FILE, 'rb') as token:
-            credentials = pickle.load(token)
-    
+
+    # The file token.json stores the user's access and refresh tokens
+    if os.path.exists(TOKEN_FILE):
+        credentials = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
+
     # If there are no valid credentials, let the user log in
     if not credentials or not credentials.valid:
         if credentials and credentials.expired and credentials.refresh_token:
             credentials.refresh(Request())
+            _save_token(credentials)
         else:
             if not os.path.exists(CREDENTIALS_FILE):
                 raise FileNotFoundError(
@@ -37,13 +73,16 @@ def authenticate():
                     "Please create OAuth credentials in Google Cloud Console "
                     "and download the JSON file to the drive_json folder."
                 )
-            
+
             # Run the OAuth flow
             flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_FILE, SCOPES)
             credentials = flow.run_local_server(port=0)
-            
+
             # Save the credentials for the next run
-            with open(TOKEN_PICKLE_FILE, 'wb') as token:
-                pickle.dump(credentials, token)
-    
+            _save_token(credentials)
+    elif credentials.refresh_token and _expires_soon(credentials):
+        # Valid but about to expire: refresh now rather than mid-batch
+        credentials.refresh(Request())
+        _save_token(credentials)
+
     return credentials 
\ No newline at end of file
@@ -5,24 +5,152 @@ Google Drive connector for interacting with Drive API
 import os
 import tempfile
 import mimetypes
+import functools
+import random
+import socket
+import threading
+import time
+import httplib2
+import google_auth_httplib2
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload, MediaIoBaseUpload
 import io
 
+# Statuses worth retrying; 403 only counts when Drive's error reason
+# marks it as rate limiting rather than a real permission problem
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+_RETRY_403_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}
+_MAX_RETRIES = 5
+
+# Transport-level failures (connection resets, timeouts, DNS hiccups)
+# are transient by nature and always worth retrying
+_TRANSIENT_EXCEPTIONS = (httplib2.HttpLib2Error, ConnectionError,
+                         TimeoutError, socket.gaierror)
+
+def _is_transient(error):
+    """Return True if an HttpError is worth retrying with backoff"""
+    status = error.resp.status
+    if status in _RETRY_STATUSES:
+        return True
+    if status == 403:
+        reasons = {
+            detail.get('reason')
+            for detail in getattr(error, 'error_details', None) or []
+            if isinstance(detail, dict)
+        }
+        return bool(reasons & _RETRY_403_REASONS)
+    return False
+
+def _retry_transient(method):
+    """
+    Retry a Drive call on rate limits and server errors
+
+    Drive sheds load with 403/429/5xx responses and expects clients to
+    back off and retry; without this a single throttled request aborts
+    the whole batch, and the parallel workers make throttling likely.
+    Transport exceptions (resets, timeouts, DNS) get the same
+    treatment. Sleeps follow truncated exponential backoff with jitter
+    (min(2^n + random, 64) seconds) for up to five retries.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        for attempt in range(_MAX_RETRIES):
+            try:
+                return method(self, *args, **kwargs)
+            except HttpError as error:
+                if not _is_transient(error):
+                    raise
+            except _TRANSIENT_EXCEPTIONS:
+                pass
+            time.sleep(min(2 ** attempt + random.random(), 64))
+        return method(self, *args, **kwargs)
+    return wrapper
+
+class _GzipAuthorizedHttp(google_auth_httplib2.AuthorizedHttp):
+    """
+    AuthorizedHttp that advertises gzip support on every request
+
+    The Drive performance guide only guarantees gzip-encoded responses
+    when the user agent contains the string "gzip", which
+    googleapiclient does not set on its own.
+    """
+
+    def request(self, uri, method='GET', body=None, headers=None, **kwargs):
+        headers = dict(headers or {})
+        headers.setdefault('accept-encoding', 'gzip')
+        user_agent = headers.get('user-agent', '')
+        if 'gzip' not in user_agent:
+            headers['user-agent'] = (user_agent + ' (gzip)').strip()
+        return super().request(uri, method, body=body, headers=headers,
+                               **kwargs)
+
 class DriveConnector:
     """
     Connector for Google Drive operations
     """
     
-    def __init__(self, credentials):
+    # Default transfer chunk size; large chunks mean fewer HTTP range
+    # requests per photo-sized file
+    DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+
+    # Files at or below this size upload in a single multipart request;
+    # the resumable protocol costs an extra session-initiation
+    # round-trip that only pays off when a retry could save real data
+    SINGLE_SHOT_UPLOAD_LIMIT = 5 * 1024 * 1024
+
+    def __init__(self, credentials, chunk_size=DEFAULT_CHUNK_SIZE):
         """
         Initialize the Drive connector
-        
+
         Args:
             credentials: Google API credentials
+            chunk_size (int, optional): Chunk size in bytes for media
+                downloads. Defaults to 8MB.
+        """
+        self.chunk_size = chunk_size
+        self._credentials = credentials
+        self._local = threading.local()
+
+        # Concurrent token refreshes can interleave partial credential
+        # state; serialize refresh while leaving actual requests free
+        # to run in parallel
+        refresh_lock = threading.Lock()
+        original_refresh = credentials.refresh
+
+        def locked_refresh(request):
+            with refresh_lock:
+                original_refresh(request)
+
+        credentials.refresh = locked_refresh
+
+    @property
+    def service(self):
+        """
+        Per-thread Drive service object
+
+        googleapiclient Resource objects and the httplib2 transport
+        underneath them are not thread-safe, so each worker thread gets
+        its own service over its own transport; within a thread the
+        pooled TLS connections are still reused across calls. The
+        credentials are shared, with refresh serialized in __init__.
         """
-        self.service = build('drive', 'v3', credentials=credentials)
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            # Explicit httplib2 transport so responses are gzip-encoded
+            # and calls from this thread reuse pooled TLS connections.
+            # Transport errors propagate as exceptions so the retry
+            # wrapper can see them for what they are, rather than being
+            # masked as synthetic 400/408 responses.
+            http = httplib2.Http(timeout=60)
+            authed_http = _GzipAuthorizedHttp(self._credentials, http=http)
+            # cache_discovery=False skips the redundant discovery-doc fetch
+            service = build('drive', 'v3', http=authed_http,
+                            cache_discovery=False)
+            self._local.service = service
+        return service
     
+    @_retry_transient
     def list_folders(self):
         """
         List all folders in the user's Drive
@@ -36,7 +164,56 @@ class DriveConnector:
         ).execute()
         
         return results.get('files', [])
-    
+
+    def list_folders_paginated(self, page_size=100):
+        """
+        Iterate over all folders in the user's Drive, page by page
+
+        Args:
+            page_size (int, optional): Folders per API page
+
+        Yields:
+            dict: Folder dictionary with 'id' and 'name' keys
+        """
+        page_token = None
+        while True:
+            results = self.service.files().list(
+                q="mimeType='application/vnd.google-apps.folder' and trashed=false",
+                fields="nextPageToken, files(id, name)",
+                pageSize=page_size,
+                pageToken=page_token
+            ).execute()
+
+            for folder in results.get('files', []):
+                yield folder
+
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+
+    @_retry_transient
+    def find_folder_by_name(self, name):
+        """
+        Look up a folder by exact name with a single scoped query
+
+        Args:
+            name (str): Folder name
+
+        Returns:
+            str: Folder ID, or None if no folder has that name
+        """
+        escaped = name.replace("\\", "\\\\").replace("'", "\\'")
+        results = self.service.files().list(
+            q=(f"name='{escaped}' and "
+               "mimeType='application/vnd.google-apps.folder' and trashed=false"),
+            fields="files(id)",
+            pageSize=1
+        ).execute()
+
+        folders = results.get('files', [])
+        return folders[0]['id'] if folders else None
+
+    @_retry_transient
     def list_image_files(self, folder_id):
         """
         List all image files in a specific folder
@@ -66,40 +243,105 @@ class DriveConnector:
         # Execute the query
         results = self.service.files().list(
             q=query,
-            fields="files(id, name, mimeType)"
+            fields="files(id, name, mimeType, size, md5Checksum)"
         ).execute()
         
         return results.get('files', [])
     
-    def download_file(self, file_id):
+    @_retry_transient
+    def batch_get_metadata(self, file_ids, fields='id, name'):
+        """
+        Fetch metadata for many files in a single batched HTTP request
+
+        Media bytes can't be batched, but metadata gets can — one
+        round-trip instead of one per file.
+
+        Args:
+            file_ids (list): Google Drive file IDs
+            fields (str, optional): Fields to request for each file
+
+        Returns:
+            dict: Mapping of file ID to its metadata dict; files that
+                errored are omitted
+        """
+        results = {}
+
+        def callback(request_id, response, exception):
+            if exception is None:
+                results[request_id] = response
+
+        # Drive allows up to 100 calls per batch request
+        for start in range(0, len(file_ids), 100):
+            batch = self.service.new_batch_http_request(callback=callback)
+            for file_id in file_ids[start:start + 100]:
+                batch.add(self.service.files().get(fileId=file_id, fields=fields),
+                          request_id=file_id)
+            batch.execute()
+
+        return results
+
+    @_retry_transient
+    def download_file(self, file_id, file_name=None, directory=None):
         """
         Download a file from Google Drive
-        
+
         Args:
             file_id (str): Google Drive file ID
-            
+            file_name (str, optional): File name, as returned by
+                list_image_files. Passing it avoids an extra metadata
+                request per file.
+            directory (str, optional): Directory for the temp file, so
+                the caller can own cleanup of a whole run at once
+
         Returns:
             str: Path to downloaded file
         """
-        # Get file metadata
-        file_metadata = self.service.files().get(fileId=file_id, fields="name").execute()
-        file_name = file_metadata.get("name")
-        
+        # Fall back to a metadata request only if the caller did not
+        # already have the name from a listing
+        if file_name is None:
+            file_metadata = self.service.files().get(fileId=file_id, fields="name").execute()
+            file_name = file_metadata.get("name")
+
         # Create a temporary file
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file_name)[1])
+        temp_file = tempfile.NamedTemporaryFile(
+            delete=False, suffix=os.path.splitext(file_name)[1], dir=directory)
         temp_path = temp_file.name
         temp_file.close()
         
-        # Download the file to the temporary path
+        # Download the file to the temporary path in large chunks
         request = self.service.files().get_media(fileId=file_id)
-        with open(temp_path, 'wb') as f:
-            downloader = MediaIoBaseDownload(f, request)
+        with open(temp_path, 'wb', buffering=1024 * 1024) as f:
+            downloader = MediaIoBaseDownload(f, request, chunksize=self.chunk_size)
             done = False
             while not done:
                 status, done = downloader.next_chunk()
         
         return temp_path
-    
+
+    @_retry_transient
+    def download_file_bytes(self, file_id):
+        """
+        Download a file from Google Drive into memory
+
+        Avoids the temp-file round-trip for files that fit comfortably
+        in RAM, such as photos.
+
+        Args:
+            file_id (str): Google Drive file ID
+
+        Returns:
+            bytes: File content
+        """
+        request = self.service.files().get_media(fileId=file_id)
+        buffer = io.BytesIO()
+        downloader = MediaIoBaseDownload(buffer, request, chunksize=self.chunk_size)
+        done = False
+        while not done:
+            status, done = downloader.next_chunk()
+
+        return buffer.getvalue()
+
+    @_retry_transient
     def create_folder(self, name, parent_id=None):
         """
         Create a new folder in Google Drive
@@ -128,6 +370,36 @@ class DriveConnector:
         
         return folder.get('id')
     
+    @_retry_transient
+    def copy_file(self, file_id, new_name, parent_id=None):
+        """
+        Copy a file server-side under a new name
+
+        No media bytes cross the wire: Drive duplicates the content
+        internally, so renaming into the output folder costs one
+        metadata round-trip instead of a download plus an upload.
+
+        Args:
+            file_id (str): Source file ID
+            new_name (str): Name for the copy
+            parent_id (str, optional): Parent folder ID for the copy
+
+        Returns:
+            str: New file ID
+        """
+        body = {'name': new_name}
+        if parent_id:
+            body['parents'] = [parent_id]
+
+        file = self.service.files().copy(
+            fileId=file_id,
+            body=body,
+            fields='id'
+        ).execute()
+
+        return file.get('id')
+
+    @_retry_transient
     def upload_file(self, file_path, file_name, parent_id=None):
         """
         Upload a file to Google Drive
@@ -152,12 +424,73 @@ class DriveConnector:
         if parent_id:
             file_metadata['parents'] = [parent_id]
         
-        # Upload the file
-        media = MediaFileUpload(file_path, mimetype=mime_type)
-        file = self.service.files().create(
+        # Small files go up in one multipart request; larger ones use
+        # the resumable protocol in large chunks
+        resumable = os.path.getsize(file_path) > self.SINGLE_SHOT_UPLOAD_LIMIT
+        media = MediaFileUpload(file_path, mimetype=mime_type,
+                                chunksize=self.chunk_size, resumable=resumable)
+        request = self.service.files().create(
             body=file_metadata,
             media_body=media,
             fields='id'
-        ).execute()
-        
-        return file.get('id') 
\ No newline at end of file
+        )
+        file = self._execute_resumable(request) if resumable else request.execute()
+
+        return file.get('id')
+
+    def _execute_resumable(self, request):
+        """
+        Drive a resumable upload request to completion
+
+        Args:
+            request: Pending googleapiclient HTTP request
+
+        Returns:
+            dict: API response
+        """
+        response = None
+        while response is None:
+            status, response = request.next_chunk()
+        return response
+
+    @_retry_transient
+    def upload_file_bytes(self, data, file_name, parent_id=None, mime_type=None):
+        """
+        Upload in-memory bytes to Google Drive
+
+        Args:
+            data (bytes): File content
+            file_name (str): Name to use for the uploaded file
+            parent_id (str, optional): Parent folder ID
+            mime_type (str, optional): MIME type; guessed from the
+                file name if not provided
+
+        Returns:
+            str: Uploaded file ID
+        """
+        # Guess the MIME type from the name if not provided
+        if not mime_type:
+            mime_type, _ = mimetypes.guess_type(file_name)
+            if not mime_type:
+                mime_type = 'application/octet-stream'
+
+        # Prepare file metadata
+        file_metadata = {'name': file_name}
+
+        # Set parent if provided
+        if parent_id:
+            file_metadata['parents'] = [parent_id]
+
+        # Upload straight from the in-memory buffer; photo-sized files
+        # fit in one multipart request, larger ones go resumable
+        resumable = len(data) > self.SINGLE_SHOT_UPLOAD_LIMIT
+        media = MediaIoBaseUpload(io.BytesIO(data), mimetype=mime_type,
+                                  chunksize=self.chunk_size, resumable=resumable)
+        request = self.service.files().create(
+            body=file_metadata,
+            media_body=media,
+            fields='id'
+        )
+        file = self._execute_resumable(request) if resumable else request.execute()
+
+        return file.get('id')
\ No newline at end of file
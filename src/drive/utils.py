@@ -53,13 +53,13 @@ def create_output_folder(drive_connector, folder_name):
     Returns:
         str: Created folder ID
     """
-    # Check if folder exists
-    folders = drive_connector.list_folders()
-    for folder in folders:
-        if folder['name'] == folder_name:
-            print(f"Folder '{folder_name}' already exists. Using existing folder.")
-            return folder['id']
-    
+    # Check if folder exists with a single scoped query instead of
+    # listing every folder in the Drive
+    existing_id = drive_connector.find_folder_by_name(folder_name)
+    if existing_id:
+        print(f"Folder '{folder_name}' already exists. Using existing folder.")
+        return existing_id
+
     # Create new folder
     print(f"Creating output folder '{folder_name}'...")
     folder_id = drive_connector.create_folder(folder_name)
@@ -3,7 +3,13 @@ Image analyzer module using OpenAI's vision capabilities
 """
 
 import os
+import asyncio
 import base64
+import hashlib
+import json
+import shelve
+import threading
+import numpy as np
 from PIL import Image
 import io
 import colorsys
@@ -11,6 +17,18 @@ import openai
 from pydantic import BaseModel
 from typing import List, Optional
 
+# Bump when the prompt or response format changes, so stale cache
+# entries are not reused
+PROMPT_VERSION = '2'
+
+# Images packed into one Vision request by analyze_batch; amortizes
+# request overhead without making a single response too long to trust
+BATCH_SIZE = 4
+
+# Longest edge sent to the Vision API; detail "low" is analyzed at this
+# scale anyway, so uploading more pixels only costs bandwidth
+UPLOAD_MAX_EDGE = 768
+
 class ImageMetadata(BaseModel):
     """Image metadata model"""
     original_filename: str
@@ -24,13 +42,16 @@ class ImageAnalyzer:
     Analyzes images using OpenAI's Vision capabilities
     """
     
-    def __init__(self, custom_categories=None, custom_moods=None):
+    def __init__(self, custom_categories=None, custom_moods=None,
+                 cache_path='.photo_cache'):
         """
         Initialize the image analyzer
-        
+
         Args:
             custom_categories (list, optional): Custom categories to use for image classification
             custom_moods (list, optional): Custom mood options to use for image classification
+            cache_path (str, optional): Path for the on-disk analysis
+                cache; set to None to disable caching
         """
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
@@ -46,91 +67,480 @@ class ImageAnalyzer:
         
         # Set default moods if none provided
         self.moods = custom_moods or [
-            "happy", "sad", "calm", "energetic", "peaceful", 
+            "happy", "sad", "calm", "energetic", "peaceful",
             "tense", "mysterious", "romantic", "nostalgic", "dramatic"
         ]
-        
-    def _encode_image_to_base64(self, image_path):
+
+        # Build the prompt once: categories/moods are fixed per analyzer
+        # instance, and a constant prompt also enables provider-side
+        # prompt caching
+        self._prompt = self._build_prompt()
+
+        # Cache analysis results on disk so re-runs on unchanged images
+        # skip the Vision call; keyed on image bytes plus a hash of the
+        # prompt configuration so changing categories/moods invalidates
+        self.cache_path = cache_path
+        self._cache_lock = threading.Lock()
+        config = '|'.join([PROMPT_VERSION,
+                           ','.join(self.categories),
+                           ','.join(self.moods)])
+        self._config_hash = hashlib.sha1(config.encode('utf-8')).hexdigest()
+
+    def _read_bytes(self, image_source):
         """
-        Encode an image to base64
-        
+        Return the raw bytes of an image source
+
         Args:
-            image_path (str): Path to the image
-            
+            image_source (str or bytes): Path to the image, or its raw bytes
+
         Returns:
-            str: Base64-encoded image
+            bytes: Image content
         """
-        with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode('utf-8')
-    
-    def _is_color_image(self, image_path):
+        if isinstance(image_source, (bytes, bytearray)):
+            return bytes(image_source)
+
+        with open(image_source, 'rb') as image_file:
+            return image_file.read()
+
+    def _cache_key(self, image_bytes):
+        """
+        Build the cache key for an image
+
+        Args:
+            image_bytes (bytes): Raw image content
+
+        Returns:
+            str: Cache key
+        """
+        return hashlib.sha256(image_bytes).hexdigest() + ':' + self._config_hash
+
+    def _cache_get(self, key):
+        """
+        Look up a cached analysis result
+
+        Args:
+            key (str): Cache key
+
+        Returns:
+            dict or None: Cached metadata fields, or None on a miss
+        """
+        if not self.cache_path:
+            return None
+
+        try:
+            with self._cache_lock, shelve.open(self.cache_path) as cache:
+                return cache.get(key)
+        except Exception:
+            # A corrupt or unreadable cache should never break analysis
+            return None
+
+    def _cache_put(self, key, fields):
+        """
+        Store an analysis result in the cache
+
+        Args:
+            key (str): Cache key
+            fields (dict): Metadata fields to cache
+        """
+        if not self.cache_path:
+            return
+
+        try:
+            with self._cache_lock, shelve.open(self.cache_path) as cache:
+                cache[key] = fields
+        except Exception:
+            pass
+
+    def cached_metadata(self, checksum, original_filename):
+        """
+        Look up a cached analysis by an external content checksum
+
+        Drive listings return md5Checksum for free, so callers can
+        check the cache before downloading anything; a hit skips both
+        the download and the model call.
+
+        Args:
+            checksum (str): Content checksum (e.g. Drive's md5Checksum)
+            original_filename (str): Original filename of the image
+
+        Returns:
+            ImageMetadata or None: Cached metadata, or None on a miss
+        """
+        cached = self._cache_get('md5:' + checksum + ':' + self._config_hash)
+        if cached is not None:
+            return ImageMetadata(original_filename=original_filename, **cached)
+        return None
+
+    def remember_checksum(self, checksum, metadata):
+        """
+        Store an analysis under an external content checksum
+
+        Args:
+            checksum (str): Content checksum (e.g. Drive's md5Checksum)
+            metadata (ImageMetadata): Analysis result to cache
+        """
+        self._cache_put('md5:' + checksum + ':' + self._config_hash,
+                        metadata.model_dump(exclude={'original_filename'}))
+
+    def _prepare_upload_bytes(self, image_bytes):
+        """
+        Downscale an image for the Vision request
+
+        The model sees detail "low" regardless, so a 24MP original adds
+        nothing over a 768px JPEG except transfer time. Images already
+        small enough pass through untouched, and anything PIL can't
+        decode is sent as-is for the API to judge.
+
+        Args:
+            image_bytes (bytes): Raw image content
+
+        Returns:
+            bytes: JPEG bytes bounded to UPLOAD_MAX_EDGE per side
+        """
+        try:
+            img = Image.open(io.BytesIO(image_bytes))
+            if (max(img.size) <= UPLOAD_MAX_EDGE
+                    and img.format in ('JPEG', 'PNG', 'GIF')):
+                return image_bytes
+
+            # Let libjpeg decode at a reduced scale before the final
+            # high-quality downsize
+            try:
+                img.draft('RGB', (UPLOAD_MAX_EDGE * 2, UPLOAD_MAX_EDGE * 2))
+            except Exception:
+                pass
+
+            img = img.convert('RGB')
+            img.thumbnail((UPLOAD_MAX_EDGE, UPLOAD_MAX_EDGE), Image.LANCZOS)
+
+            buffer = io.BytesIO()
+            img.save(buffer, 'JPEG', quality=85)
+            return buffer.getvalue()
+        except Exception:
+            return image_bytes
+
+    def _load_thumbnail(self, image_source):
+        """
+        Decode an image once into a small RGB thumbnail
+
+        The thumbnail is shared by all local analyses so each image is
+        only decoded a single time.
+
+        Args:
+            image_source (str or bytes): Path to the image, or its raw bytes
+
+        Returns:
+            Image: 100x100 RGB thumbnail
+        """
+        if isinstance(image_source, (bytes, bytearray)):
+            img = Image.open(io.BytesIO(image_source))
+        else:
+            img = Image.open(image_source)
+
+        # JPEG fast path: draft mode lets libjpeg decode at a reduced
+        # DCT scale, so a 4000x3000 photo never gets fully decoded just
+        # for color statistics. No-op for other formats.
+        try:
+            img.draft('RGB', (200, 200))
+        except Exception:
+            pass
+
+        # Convert to RGB and downsize for faster processing; thumbnail
+        # on the drafted image touches far fewer pixels than a
+        # full-resolution resize
+        img = img.convert('RGB')
+        img.thumbnail((100, 100), Image.NEAREST)
+        return img
+
+    def _is_color_image(self, image_source):
         """
         Determine if an image is color or black and white
-        
+
         Args:
-            image_path (str): Path to the image
-            
+            image_source (Image, str or bytes): Thumbnail from
+                _load_thumbnail, or a path/raw bytes to decode
+
         Returns:
             bool: True if the image is in color, False if black and white
         """
-        # Open image and convert to RGB
-        img = Image.open(image_path).convert('RGB')
-        
-        # Resize for faster processing
-        img = img.resize((100, 100))
-        
-        # Get colors
-        colors = img.getcolors(10000)  # Get all colors
-        
-        # Check if the image has meaningful color variation
-        is_color = False
-        for _, (r, g, b) in colors:
-            # TODO: is this true
-            # If R, G, and B values differ by more than a threshold, it's a color image
-            if max(abs(r - g), abs(r - b), abs(g - b)) > 15:
-                is_color = True
-                break
-                
-        return is_color
+        if isinstance(image_source, Image.Image):
+            img = image_source
+        else:
+            img = self._load_thumbnail(image_source)
+
+        # Quantize to a small palette so the check scans at most 16
+        # representative colors instead of every thumbnail pixel, and
+        # single-pixel noise can't flip the result
+        pal = img.quantize(colors=16, method=Image.Quantize.MEDIANCUT)
+        palette = np.array(pal.getpalette(), dtype=np.uint8).reshape(-1, 3)
+
+        # Only consider palette entries actually referenced by pixels
+        used = np.unique(np.asarray(pal))
+        palette = palette[used]
+
+        # If R, G, and B values differ by more than a threshold for any
+        # dominant color, it's a color image; the per-entry channel
+        # spread (max - min) is exactly the max pairwise difference
+        return bool((np.ptp(palette, axis=1) > 15).any())
     
-    def analyze(self, image_path, original_filename):
+    def analyze(self, image_source, original_filename):
         """
         Analyze an image using OpenAI's Vision capabilities
-        
+
         Args:
-            image_path (str): Path to the image
+            image_source (str or bytes): Path to the image, or its raw bytes
             original_filename (str): Original filename
-            
+
         Returns:
             ImageMetadata: Extracted metadata
         """
-        # Encode image to base64
-        base64_image = self._encode_image_to_base64(image_path)
-        
+        image_bytes = self._read_bytes(image_source)
+
+        # Return the cached result if this exact image was analyzed
+        # before with the same prompt configuration
+        cache_key = self._cache_key(image_bytes)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return ImageMetadata(original_filename=original_filename, **cached)
+
+        # Downscale for upload, then encode to base64; ascii decode
+        # since base64 output is pure ASCII
+        base64_image = base64.b64encode(
+            self._prepare_upload_bytes(image_bytes)).decode('ascii')
+
+        # Decode once into a shared thumbnail for the local analyses
+        thumbnail = self._load_thumbnail(image_bytes)
+
         # Check if image is color or black and white
-        is_color = self._is_color_image(image_path)
-        
+        is_color = self._is_color_image(thumbnail)
+
+        # Call the OpenAI API
+        response = openai.ChatCompletion.create(**self._vision_request(base64_image))
+
+        # Parse the response
+        result = response.choices[0].message['content']
+
+        metadata = self._parse_response(result, original_filename, is_color)
+        self._cache_put(cache_key, metadata.model_dump(exclude={'original_filename'}))
+
+        return metadata
+
+    def analyze_batch(self, images, batch_size=BATCH_SIZE):
+        """
+        Analyze several images, packing them into shared Vision calls
+
+        Batching amortizes the per-request overhead (TLS setup, prompt
+        prefix, round-trip latency) over batch_size images. Cached
+        images are answered locally; if a batched response does not
+        line up with its images, the chunk falls back to per-image
+        analyze calls so results are never misattributed.
+
+        Args:
+            images (list): (image_source, original_filename) pairs
+            batch_size (int, optional): Images per API call
+
+        Returns:
+            list: ImageMetadata per input pair, in input order
+        """
+        results = [None] * len(images)
+        pending = []
+
+        for i, (image_source, original_filename) in enumerate(images):
+            image_bytes = self._read_bytes(image_source)
+            cache_key = self._cache_key(image_bytes)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                results[i] = ImageMetadata(
+                    original_filename=original_filename, **cached)
+            else:
+                pending.append((i, image_bytes, cache_key, original_filename))
+
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start:start + batch_size]
+            items = self._analyze_chunk([entry[1] for entry in chunk])
+
+            if items is None:
+                # Unusable batched response: analyze this chunk one
+                # image at a time rather than guessing the mapping
+                for i, image_bytes, _, original_filename in chunk:
+                    results[i] = self.analyze(image_bytes, original_filename)
+                continue
+
+            for (i, image_bytes, cache_key, original_filename), fields in zip(
+                    chunk, items):
+                is_color = self._is_color_image(image_bytes)
+                metadata = self._metadata_from_fields(
+                    fields, original_filename, is_color)
+                self._cache_put(
+                    cache_key,
+                    metadata.model_dump(exclude={'original_filename'}))
+                results[i] = metadata
+
+        return results
+
+    def _analyze_chunk(self, images_bytes):
+        """
+        Send one batched Vision request for a chunk of images
+
+        Args:
+            images_bytes (list): Raw bytes of each image in the chunk
+
+        Returns:
+            list or None: Parsed per-image field dicts in chunk order,
+                or None if the response can't be matched to the images
+        """
+        base64_images = [
+            base64.b64encode(self._prepare_upload_bytes(data)).decode('ascii')
+            for data in images_bytes
+        ]
+        response = openai.ChatCompletion.create(
+            **self._batch_vision_request(base64_images))
+        result = response.choices[0].message['content']
+
+        try:
+            parsed = json.loads(result)
+        except ValueError:
+            return None
+
+        items = parsed.get('images')
+        if not isinstance(items, list) or len(items) != len(images_bytes):
+            return None
+        return items
+
+    async def analyze_async(self, image_source, original_filename):
+        """
+        Asynchronous variant of analyze for event-loop callers
+
+        Dispatches the Vision call with the async OpenAI API so many
+        images can be in flight concurrently; the CPU-bound color
+        analysis runs off the event loop in a thread.
+
+        Args:
+            image_source (str or bytes): Path to the image, or its raw bytes
+            original_filename (str): Original filename
+
+        Returns:
+            ImageMetadata: Extracted metadata
+        """
+        image_bytes = await asyncio.to_thread(self._read_bytes, image_source)
+
+        # Return the cached result if this exact image was analyzed
+        # before with the same prompt configuration
+        cache_key = self._cache_key(image_bytes)
+        cached = await asyncio.to_thread(self._cache_get, cache_key)
+        if cached is not None:
+            return ImageMetadata(original_filename=original_filename, **cached)
+
+        # Run the local (blocking) work in a thread
+        upload_bytes = await asyncio.to_thread(
+            self._prepare_upload_bytes, image_bytes)
+        base64_image = base64.b64encode(upload_bytes).decode('ascii')
+        is_color = await asyncio.to_thread(self._is_color_image, image_bytes)
+
+        # Call the OpenAI API without blocking the event loop
+        response = await openai.ChatCompletion.acreate(
+            **self._vision_request(base64_image))
+
+        # Parse the response
+        result = response.choices[0].message['content']
+
+        metadata = self._parse_response(result, original_filename, is_color)
+        await asyncio.to_thread(
+            self._cache_put, cache_key,
+            metadata.model_dump(exclude={'original_filename'}))
+
+        return metadata
+
+    def _build_prompt(self):
+        """
+        Construct the analysis prompt for this analyzer's configuration
+
+        Returns:
+            str: Prompt text
+        """
         # Format categories and moods for the prompt
         categories_str = ", ".join(self.categories)
         moods_str = ", ".join(self.moods)
-        
-        # Construct the prompt
-        prompt = f"""
+
+        return f"""
         Analyze this image and provide the following information:
         1. A concise description (5 words or less) that captures the essence of the image
-        2. Categories that apply to this image (comma-separated, choose from: {categories_str})
+        2. Categories that apply to this image (choose from: {categories_str})
         3. The overall mood/feeling of the image (choose one from: {moods_str})
-        
-        Format your response as:
-        Short Description: [short description]
-        Categories: [category1, category2, ...]
-        Mood: [mood]
+
+        Respond only with JSON in this exact shape:
+        {{"short_description": "...", "categories": ["...", "..."], "mood": "..."}}
         """
-        
-        # Call the OpenAI API
-        response = openai.ChatCompletion.create(
-            model="gpt-4o",  # Use the current stable model that supports vision
-            messages=[
+
+    def _build_batch_prompt(self, count):
+        """
+        Construct the analysis prompt for a batched request
+
+        Args:
+            count (int): Number of images in the request
+
+        Returns:
+            str: Prompt text
+        """
+        categories_str = ", ".join(self.categories)
+        moods_str = ", ".join(self.moods)
+
+        return f"""
+        You are shown {count} images. For each image, in the order given, provide:
+        1. A concise description (5 words or less) that captures the essence of the image
+        2. Categories that apply to the image (choose from: {categories_str})
+        3. The overall mood/feeling of the image (choose one from: {moods_str})
+
+        Respond only with JSON in this exact shape, with exactly {count} entries in the same order as the images:
+        {{"images": [{{"short_description": "...", "categories": ["...", "..."], "mood": "..."}}]}}
+        """
+
+    def _batch_vision_request(self, base64_images):
+        """
+        Build the chat-completion request for a batch of images
+
+        Args:
+            base64_images (list): Base64-encoded images
+
+        Returns:
+            dict: Keyword arguments for the chat-completion call
+        """
+        content = [{"type": "text",
+                    "text": self._build_batch_prompt(len(base64_images))}]
+        content.extend(
+            {
+                "type": "image_url",
+                "image_url": {
+                    "url": f"data:image/jpeg;base64,{base64_image}",
+                    "detail": "low"
+                }
+            }
+            for base64_image in base64_images
+        )
+
+        return {
+            'model': "gpt-4o",
+            'response_format': {"type": "json_object"},
+            'messages': [{"role": "user", "content": content}],
+            'max_tokens': 300 * len(base64_images)
+        }
+
+    def _vision_request(self, base64_image):
+        """
+        Build the chat-completion request for a single image
+
+        Args:
+            base64_image (str): Base64-encoded image
+
+        Returns:
+            dict: Keyword arguments for the chat-completion call
+        """
+        prompt = self._prompt
+
+        return {
+            'model': "gpt-4o",  # Use the current stable model that supports vision
+            'response_format': {"type": "json_object"},
+            'messages': [
                 {
                     "role": "user",
                     "content": [
@@ -145,27 +555,49 @@ class ImageAnalyzer:
                     ]
                 }
             ],
-            max_tokens=300
-        )
-        
-        # Parse the response
-        result = response.choices[0].message['content']
-        
-        # Extract information
-        short_description = ""
-        categories = []
-        mood = ""
-        
-        for line in result.split('\n'):
-            line = line.strip()
-            if line.startswith("Short Description:"):
-                short_description = line.replace("Short Description:", "").strip().upper()
-            elif line.startswith("Categories:"):
-                categories_str = line.replace("Categories:", "").strip()
-                categories = [cat.strip() for cat in categories_str.split(',')]
-            elif line.startswith("Mood:"):
-                mood = line.replace("Mood:", "").strip()
-        
+            'max_tokens': 300
+        }
+
+    def _parse_response(self, result, original_filename, is_color):
+        """
+        Parse the model's response into metadata
+
+        Args:
+            result (str): Raw response text from the model
+            original_filename (str): Original filename
+            is_color (bool): Result of the local color check
+
+        Returns:
+            ImageMetadata: Extracted metadata
+        """
+        # JSON mode makes parsing a single json.loads instead of
+        # per-line string scanning
+        try:
+            parsed = json.loads(result)
+        except ValueError:
+            parsed = {}
+
+        return self._metadata_from_fields(parsed, original_filename, is_color)
+
+    def _metadata_from_fields(self, parsed, original_filename, is_color):
+        """
+        Build ImageMetadata from one parsed response object
+
+        Args:
+            parsed (dict): Fields for one image from the model
+            original_filename (str): Original filename
+            is_color (bool): Result of the local color check
+
+        Returns:
+            ImageMetadata: Extracted metadata
+        """
+        if not isinstance(parsed, dict):
+            parsed = {}
+
+        short_description = str(parsed.get('short_description', '')).strip().upper()
+        categories = [str(cat).strip() for cat in parsed.get('categories', [])]
+        mood = str(parsed.get('mood', '')).strip()
+
         # Create and return the metadata
         return ImageMetadata(
             original_filename=original_filename,
@@ -173,4 +605,4 @@ class ImageAnalyzer:
             categories=categories,
             is_color=is_color,
             mood=mood
-        ) 
\ No newline at end of file
+        )
\ No newline at end of file
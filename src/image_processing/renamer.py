@@ -3,65 +3,80 @@ Image renaming module
 """
 
 import os
-import re
+import string
+
+# Deletion table keeping only letters, digits and spaces; built once at
+# import so sanitizing is a single C-level translate per call
+_ALLOWED = frozenset(string.ascii_letters + string.digits + ' ')
+_DELETE_TABLE = str.maketrans(
+    '', '', ''.join(chr(c) for c in range(256) if chr(c) not in _ALLOWED))
 
 def sanitize_description(description):
     """
     Sanitize a description for use in a filename
-    
+
     Args:
         description (str): Description to sanitize
-        
+
     Returns:
         str: Sanitized description
     """
-    # Remove any characters that are not letters, numbers, or spaces
-    sanitized = re.sub(r'[^a-zA-Z0-9\s]', '', description)
-    
+    # Remove any characters that are not letters, numbers, or spaces;
+    # the ascii round-trip drops codepoints beyond the table's range
+    sanitized = description.encode('ascii', 'ignore').decode('ascii')
+    sanitized = sanitized.translate(_DELETE_TABLE)
+
     # Replace spaces with underscores
     sanitized = sanitized.replace(' ', '_')
-    
+
     # Limit to 30 characters
     sanitized = sanitized[:30]
-    
+
     # Ensure uppercase
     sanitized = sanitized.upper()
-    
+
     return sanitized
 
+def rename_image(image, number):
+    """
+    Rename a single image based on its metadata
+
+    Split out from rename_images so pipelined callers can name an
+    image as soon as its analysis finishes, given its position.
+
+    Args:
+        image (dict): Processed image dictionary
+        number (int): 1-based position used for the filename prefix
+
+    Returns:
+        dict: Dictionary with renamed image information
+    """
+    # Extract original filename and metadata
+    original_filename = image['original_file']['name']
+    metadata = image['metadata']
+
+    # Get file extension
+    _, extension = os.path.splitext(original_filename)
+
+    # Sanitize the description
+    description = sanitize_description(metadata.short_description)
+
+    # Carry over the image content (either a 'temp_path' on disk or
+    # in-memory 'data' bytes)
+    renamed = dict(image)
+    renamed['original_filename'] = original_filename
+    renamed['new_name'] = f"{number:04d}-{description}{extension}"
+    return renamed
+
 def rename_images(processed_images):
     """
     Rename images based on their metadata
-    
+
     Args:
         processed_images (list): List of processed image dictionaries
-        
+
     Returns:
         list: List of dictionaries with renamed image information
     """
-    renamed_images = []
-    
-    for i, image in enumerate(processed_images, 1):
-        # Extract original filename and metadata
-        original_filename = image['original_file']['name']
-        metadata = image['metadata']
-        
-        # Get file extension
-        _, extension = os.path.splitext(original_filename)
-        
-        # Sanitize the description
-        description = sanitize_description(metadata.short_description)
-        
-        # Create the new filename
-        new_name = f"{i:04d}-{description}{extension}"
-        
-        # Add to renamed images list
-        renamed_images.append({
-            'original_file': image['original_file'],
-            'original_filename': original_filename,
-            'temp_path': image['temp_path'],
-            'new_name': new_name,
-            'metadata': metadata
-        })
-    
-    return renamed_images 
\ No newline at end of file
+    return [rename_image(image, i)
+            for i, image in enumerate(processed_images, 1)]
\ No newline at end of file
@@ -7,54 +7,166 @@ Main entry point for the application
 import os
 import sys
 import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
+from tqdm import tqdm
 
-# Import local modules
-from auth.google_auth import authenticate
-from drive.connector import DriveConnector
-from drive.utils import select_folder, create_output_folder
-from image_processing.analyzer import ImageAnalyzer
-from image_processing.renamer import rename_images
-from metadata.export import export_metadata
-from metadata.import_file import import_from_file
+# Local modules are imported inside the functions that need them:
+# pulling in googleapiclient, PIL and openai costs over a second, which
+# --help and the early error paths shouldn't pay
+
+# Concurrency limits: one pool for the pipeline, separate semaphores so
+# OpenAI and Drive quotas can be throttled independently
+MAX_WORKERS = 8
+OPENAI_CONCURRENCY = 4
+DRIVE_CONCURRENCY = 8
 
 def parse_arguments():
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(description='Smart Photo Organizer')
-    parser.add_argument('--input-folder-id', help='Google Drive folder ID to process')
-    parser.add_argument('--output-folder-name', default='Processed Photos', 
+    parser.add_argument('--input-folder-id', nargs='+',
+                        help='Google Drive folder ID(s) to process; several '
+                             'folders share one authentication and analyzer')
+    parser.add_argument('--output-folder-name', default='Processed Photos',
                         help='Name for the output folder')
     parser.add_argument('--format', choices=['csv', 'excel'], default='excel',
                         help='Format for metadata export (default: excel)')
-    parser.add_argument('--categories', 
+    parser.add_argument('--categories',
                         help='Custom categories to use (comma-separated)')
-    parser.add_argument('--moods', 
+    parser.add_argument('--moods',
                         help='Custom moods to use (comma-separated)')
     parser.add_argument('--import-file',
                         help='Import categories and moods from a CSV or TXT file')
     return parser.parse_args()
 
+def process_folder(drive, analyzer, input_folder_id, output_folder_id,
+                   export_format):
+    """
+    Process one Drive folder: analyze, rename, copy server-side, export
+
+    Args:
+        drive: DriveConnector instance
+        analyzer: ImageAnalyzer instance
+        input_folder_id (str): Folder to process
+        output_folder_id (str): Folder for renamed images and metadata
+        export_format (str): Metadata export format ('excel' or 'csv')
+
+    Returns:
+        int: 0 on success, 1 if nothing could be processed
+    """
+    from image_processing.renamer import rename_image
+    from metadata.export import export_metadata
+
+    # List image files in the input folder
+    print(f"Listing image files in folder {input_folder_id}...")
+    image_files = drive.list_image_files(input_folder_id)
+
+    if not image_files:
+        print("No image files found in the selected folder.")
+        return 1
+
+    print(f"Found {len(image_files)} image files.")
+
+    # Process images in parallel: download, analyze, rename and copy
+    # are pipelined per image, so one file's server-side copy overlaps
+    # the download and analysis of the next instead of running as
+    # serial phases. An image's position in the listing fixes its
+    # 0001- prefix up front, which is what makes per-image renaming
+    # possible; a failed image therefore leaves a gap in the numbering
+    # rather than shifting every later name
+    print("Processing images...")
+    openai_semaphore = threading.Semaphore(OPENAI_CONCURRENCY)
+    drive_semaphore = threading.Semaphore(DRIVE_CONCURRENCY)
+
+    def process_one(index, image):
+        """Analyze, rename and server-side copy a single image"""
+        # Analyze image, unless Drive's md5Checksum from the listing
+        # already maps to a cached analysis of the same content; the
+        # download only happens on a cache miss
+        checksum = image.get('md5Checksum')
+        metadata = (analyzer.cached_metadata(checksum, image['name'])
+                    if checksum else None)
+        if metadata is None:
+            with drive_semaphore:
+                data = drive.download_file_bytes(image['id'])
+            with openai_semaphore:
+                metadata = analyzer.analyze(data, image['name'])
+            if checksum:
+                analyzer.remember_checksum(checksum, metadata)
+            data = None
+
+        entry = rename_image(
+            {'original_file': image, 'metadata': metadata}, index + 1)
+
+        # The renamed file is byte-for-byte the original, so have Drive
+        # duplicate it server-side instead of re-uploading the media
+        with drive_semaphore:
+            drive.copy_file(image['id'], entry['new_name'], output_folder_id)
+
+        return entry
+
+    processed_by_index = {}
+    failed_images = []
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(process_one, i, image): i
+            for i, image in enumerate(image_files)
+        }
+        for future in tqdm(as_completed(futures), total=len(futures),
+                           desc="Processing images"):
+            index = futures[future]
+            try:
+                processed_by_index[index] = future.result()
+            except Exception as e:
+                # One bad image shouldn't abort the whole batch
+                failed_images.append(f"{image_files[index]['name']}: {str(e)}")
+
+    if failed_images:
+        print(f"Warning: {len(failed_images)} images failed processing:")
+        for failed in failed_images:
+            print(f"  - {failed}")
+
+    if not processed_by_index:
+        print("All images failed processing.")
+        return 1
+
+    # Restore the original listing order for the metadata export
+    renamed_images = [processed_by_index[i] for i in sorted(processed_by_index)]
+
+    # Export metadata in memory and upload it straight from the
+    # buffer; no temp file to write, read back or clean up
+    print("Exporting metadata...")
+    metadata_name, metadata_bytes = export_metadata(
+        renamed_images, export_format)
+
+    print("Uploading metadata file...")
+    drive.upload_file_bytes(metadata_bytes, metadata_name, output_folder_id)
+
+    return 0
+
 def main():
     """Main entry point for the application"""
     # Load environment variables
     load_dotenv()
-    
+
     # Parse command line arguments
     args = parse_arguments()
-    
+
     try:
         # Process custom categories and moods
         custom_categories = None
         custom_moods = None
-        
+
         # Check if import file is provided
         if args.import_file:
             if not os.path.exists(args.import_file):
                 print(f"Error: Import file '{args.import_file}' not found.")
                 return 1
-                
+
             print(f"Importing categories and moods from '{args.import_file}'...")
             try:
+                from metadata.import_file import import_from_file
                 custom_categories, custom_moods = import_from_file(args.import_file)
                 print(f"Imported {len(custom_categories)} categories and {len(custom_moods)} moods.")
             except Exception as e:
@@ -63,104 +175,58 @@ def main():
         # If no import file but categories/moods provided as arguments
         elif args.categories:
             custom_categories = [cat.strip() for cat in args.categories.split(',')]
-            
+
         if args.moods and not args.import_file:
             custom_moods = [mood.strip() for mood in args.moods.split(',')]
-        
+
+        # Heavy imports deferred until the arguments have validated
+        from auth.google_auth import authenticate
+        from drive.connector import DriveConnector
+        from drive.utils import select_folder, create_output_folder
+        from image_processing.analyzer import ImageAnalyzer
+
         # Authenticate with Google Drive
         print("Authenticating with Google Drive...")
         credentials = authenticate()
-        
+
         # Create Drive connector
         drive = DriveConnector(credentials)
-        
+
         # Select input folder if not provided
-        input_folder_id = args.input_folder_id
-        if not input_folder_id:
-            input_folder_id = select_folder(drive)
-            if not input_folder_id:
+        input_folder_ids = args.input_folder_id
+        if not input_folder_ids:
+            selected = select_folder(drive)
+            if not selected:
                 print("No folder selected. Exiting.")
                 return 1
-        
+            input_folder_ids = [selected]
+
         # Create output folder
         output_folder_id = create_output_folder(drive, args.output_folder_name)
-        
-        # List image files in the input folder
-        print(f"Listing image files in the selected folder...")
-        image_files = drive.list_image_files(input_folder_id)
-        
-        if not image_files:
-            print("No image files found in the selected folder.")
-            return 1
-        
-        print(f"Found {len(image_files)} image files.")
-        
-        # Initialize image analyzer with custom settings if provided
+
+        # Initialize image analyzer with custom settings if provided;
+        # the connector and analyzer are shared across all folders so
+        # the setup cost is paid once per invocation
         analyzer = ImageAnalyzer(
             custom_categories=custom_categories,
             custom_moods=custom_moods
         )
-        
-        # Process images
-        print("Processing images...")
-        processed_images = []
-        
-        for image in image_files:
-            print(f"Processing {image['name']}...")
-            # Download image to temporary location
-            temp_path = drive.download_file(image['id'])
-            
-            # Analyze image
-            metadata = analyzer.analyze(temp_path, image['name'])
-            
-            # Add to processed list
-            processed_images.append({
-                'original_file': image,
-                'temp_path': temp_path,
-                'metadata': metadata
-            })
-        
-        # Rename images based on metadata
-        print("Renaming images...")
-        renamed_images = rename_images(processed_images)
-        
-        # Upload renamed images to output folder
-        print("Uploading renamed images...")
-        for image in renamed_images:
-            drive.upload_file(
-                image['temp_path'], 
-                image['new_name'], 
-                output_folder_id
-            )
-            
-            # Clean up temporary file
-            if os.path.exists(image['temp_path']):
-                os.remove(image['temp_path'])
-        
-        # Export metadata
-        print("Exporting metadata...")
-        metadata_file = export_metadata(renamed_images, args.format)
-        
-        # Upload metadata file to output folder
-        print("Uploading metadata file...")
-        drive.upload_file(
-            metadata_file,
-            os.path.basename(metadata_file),
-            output_folder_id
-        )
-        
-        # Clean up metadata file
-        if os.path.exists(metadata_file):
-            os.remove(metadata_file)
-        
-        print("Processing complete!")
-        print(f"Processed images and metadata saved to '{args.output_folder_name}' folder in Google Drive")
-        
-        return 0
-        
+
+        exit_code = 0
+        for input_folder_id in input_folder_ids:
+            result = process_folder(drive, analyzer, input_folder_id,
+                                    output_folder_id, args.format)
+            exit_code = exit_code or result
+
+        if exit_code == 0:
+            print("Processing complete!")
+            print(f"Processed images and metadata saved to '{args.output_folder_name}' folder in Google Drive")
+
+        return exit_code
+
     except Exception as e:
         print(f"Error: {str(e)}")
         return 1
 
 if __name__ == "__main__":
-    sys.exit(main()) 
\ No newline at end of file
+    sys.exit(main())
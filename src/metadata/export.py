@@ -2,77 +2,169 @@
 Metadata export module
 """
 
-import os
-import tempfile
-import pandas as pd
-import shutil
+import csv
+import io
+import zipfile
+from xml.sax.saxutils import escape
+import numpy as np
+import openpyxl
+from openpyxl.utils import get_column_letter
 
-def export_metadata(renamed_images, format='excel'):
+# Column headers for the metadata overview
+COLUMNS = ['Original Filename', 'New Filename', 'Short Description',
+           'Categories', 'Color Type', 'Mood']
+
+# Above this row count, skip the openpyxl object layer and emit the
+# worksheet XML directly
+DIRECT_XML_THRESHOLD = 5000
+
+# Boilerplate parts of a minimal single-sheet xlsx package
+_XLSX_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>
+</Types>"""
+
+_XLSX_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>"""
+
+_XLSX_WORKBOOK = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets>
+</workbook>"""
+
+_XLSX_WORKBOOK_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>
+</Relationships>"""
+
+def _metadata_rows(renamed_images):
     """
-    Export image metadata to a file
-    
+    Build the overview table rows from renamed images
+
     Args:
         renamed_images (list): List of renamed image dictionaries
-        format (str): Export format ('excel' or 'csv')
-        
+
     Returns:
-        str: Path to the exported file
+        list: One tuple per image, in COLUMNS order
     """
-    # Create a temporary file with appropriate suffix
-    file_suffix = '.xlsx' if format == 'excel' else '.csv'
-    with tempfile.NamedTemporaryFile(delete=False, suffix=file_suffix) as temp_file:
-        temp_path = temp_file.name
-    
-    # Prepare data for DataFrame
-    data = []
+    rows = []
     for image in renamed_images:
         metadata = image['metadata']
-        
-        # Add to data list
-        data.append({
-            'Original Filename': image['original_filename'],
-            'New Filename': image['new_name'],
-            'Short Description': metadata.short_description,
-            'Categories': ', '.join(metadata.categories),
-            'Color Type': 'Color' if metadata.is_color else 'Black & White',
-            'Mood': metadata.mood
-        })
-    
-    # Create DataFrame
-    df = pd.DataFrame(data)
-    
-    # Export to file
-    if format == 'excel':
-        df.to_excel(temp_path, index=False, engine='openpyxl')
-        
-        # Adjust column widths for better readability
-        with pd.ExcelWriter(temp_path, engine='openpyxl', mode='a', if_sheet_exists='replace') as writer:
-            df.to_excel(writer, index=False, sheet_name='Sheet1')
-            
-            # Get the worksheet
-            worksheet = writer.sheets['Sheet1']
-            
-            # Set column widths
-            for i, col in enumerate(df.columns):
-                # Find the maximum length of data in this column
-                max_len = max(
-                    df[col].astype(str).apply(len).max(),
-                    len(col)
-                ) + 2  # Add some extra space
-                
-                # Set the column width
-                worksheet.column_dimensions[chr(65 + i)].width = max_len
+        rows.append((
+            image['original_filename'],
+            image['new_name'],
+            metadata.short_description,
+            ', '.join(metadata.categories),
+            'Color' if metadata.is_color else 'Black & White',
+            metadata.mood
+        ))
+
+    return rows
+
+def _write_xlsx(target, columns, rows):
+    """
+    Write the overview sheet with a write-only workbook
+
+    Write-only mode streams rows straight to the target without keeping
+    Cell objects alive, so memory stays flat regardless of image count.
+
+    Args:
+        target: Binary file-like object to write to
+        columns (list): Column headers
+        rows (list): Row tuples
+    """
+    workbook = openpyxl.Workbook(write_only=True)
+    worksheet = workbook.create_sheet('Sheet1')
+
+    # Column widths must be declared before any rows are appended in
+    # write-only mode; one vectorized string-length pass replaces the
+    # per-cell Python scan
+    header_lens = np.array([len(col) for col in columns])
+    if rows:
+        cell_lens = np.char.str_len(np.asarray(rows, dtype=str)).max(axis=0)
+        widths = np.maximum(cell_lens, header_lens) + 2
     else:
-        df.to_csv(temp_path, index=False)
-    
-    # Create the final file path with the desired filename
-    final_filename = 'overview' + file_suffix
-    final_path = os.path.join(os.path.dirname(temp_path), final_filename)
-    
-    # Copy the temp file to the final file with the desired name
-    shutil.copy2(temp_path, final_path)
-    
-    # Clean up the temp file
-    os.remove(temp_path)
-    
-    return final_path 
\ No newline at end of file
+        widths = header_lens + 2
+
+    for i, width in enumerate(widths):
+        worksheet.column_dimensions[get_column_letter(i + 1)].width = int(width)
+
+    worksheet.append(columns)
+    for row in rows:
+        worksheet.append(row)
+
+    workbook.save(target)
+
+def _write_xlsx_direct(target, columns, rows):
+    """
+    Write the overview sheet by emitting worksheet XML directly
+
+    For very large exports even the write-only workbook spends most of
+    its time in openpyxl's serialization layer; a flat table of inline
+    strings can be formatted as XML straight into the zip.
+
+    Args:
+        target: Binary file-like object to write to
+        columns (list): Column headers
+        rows (list): Row tuples
+    """
+    def row_xml(values):
+        cells = ''.join(
+            f'<c t="inlineStr"><is><t>{escape(str(v))}</t></is></c>'
+            for v in values)
+        return f'<row>{cells}</row>'
+
+    with zipfile.ZipFile(target, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', _XLSX_CONTENT_TYPES)
+        archive.writestr('_rels/.rels', _XLSX_RELS)
+        archive.writestr('xl/workbook.xml', _XLSX_WORKBOOK)
+        archive.writestr('xl/_rels/workbook.xml.rels', _XLSX_WORKBOOK_RELS)
+
+        sheet = ''.join([
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>',
+            '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">',
+            '<sheetData>',
+            row_xml(columns),
+            *[row_xml(row) for row in rows],
+            '</sheetData>',
+            '</worksheet>',
+        ])
+        archive.writestr('xl/worksheets/sheet1.xml', sheet)
+
+def export_metadata(renamed_images, format='excel'):
+    """
+    Export image metadata into an in-memory buffer
+
+    Serializing straight into memory skips the temp-file write, the
+    read-back for upload and the cleanup unlink; callers upload the
+    bytes or drop them into a zip directly.
+
+    Args:
+        renamed_images (list): List of renamed image dictionaries
+        format (str): Export format ('excel' or 'csv')
+
+    Returns:
+        tuple: (filename, bytes) of the exported overview
+    """
+    rows = _metadata_rows(renamed_images)
+
+    if format == 'excel':
+        buffer = io.BytesIO()
+        if len(rows) > DIRECT_XML_THRESHOLD:
+            _write_xlsx_direct(buffer, COLUMNS, rows)
+        else:
+            _write_xlsx(buffer, COLUMNS, rows)
+        return 'overview.xlsx', buffer.getvalue()
+
+    # Stream rows straight into the buffer; a DataFrame adds nothing
+    # for a flat six-column table
+    text_buffer = io.StringIO(newline='')
+    writer = csv.writer(text_buffer)
+    writer.writerow(COLUMNS)
+    writer.writerows(rows)
+    return 'overview.csv', text_buffer.getvalue().encode('utf-8')
\ No newline at end of file
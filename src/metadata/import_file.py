@@ -4,8 +4,12 @@ Import module for categories and moods from CSV or TXT files
 
 import os
 import csv
+import re
 import tempfile
 
+# Matches the section separator line between categories and moods
+_SEPARATOR_RE = re.compile(r'(?m)^\s*---\s*$')
+
 def import_from_file(file_path):
     """
     Import categories and moods from a CSV or TXT file
@@ -30,6 +34,18 @@ def import_from_file(file_path):
     else:
         raise ValueError(f"Unsupported file format: {file_extension}. Please use .csv or .txt files.")
 
+def _dedupe(items):
+    """
+    Remove duplicate entries while preserving first-seen order
+
+    Args:
+        items (list): Imported category or mood names
+
+    Returns:
+        list: Items with duplicates removed
+    """
+    return list(dict.fromkeys(items))
+
 def _import_from_csv(file_path):
     """
     Import from a CSV file
@@ -40,18 +56,13 @@ def _import_from_csv(file_path):
     Returns:
         tuple: (categories, moods) lists
     """
-    categories = []
-    moods = []
-    
     with open(file_path, 'r', newline='', encoding='utf-8') as csvfile:
-        reader = csv.reader(csvfile)
-        for row in reader:
-            if len(row) >= 1 and row[0].strip():
-                categories.append(row[0].strip())
-            if len(row) >= 2 and row[1].strip():
-                moods.append(row[1].strip())
-    
-    return categories, moods
+        rows = list(csv.reader(csvfile))
+
+    categories = [row[0].strip() for row in rows if row and row[0].strip()]
+    moods = [row[1].strip() for row in rows if len(row) >= 2 and row[1].strip()]
+
+    return _dedupe(categories), _dedupe(moods)
 
 def _import_from_txt(file_path):
     """
@@ -66,40 +77,33 @@ def _import_from_txt(file_path):
     Returns:
         tuple: (categories, moods) lists
     """
-    categories = []
-    moods = []
-    
-    current_section = 'categories'  # Start with categories section
-    
     with open(file_path, 'r', encoding='utf-8') as txtfile:
-        for line in txtfile:
-            line = line.strip()
-            if not line:
-                continue  # Skip empty lines
-                
-            if line == '---':
-                current_section = 'moods'  # Switch to moods section
-                continue
-                
-            if current_section == 'categories':
-                categories.append(line)
-            else:
-                moods.append(line)
-    
-    return categories, moods
+        content = txtfile.read()
+
+    # Split the whole file on the separator line once, then clean each
+    # section with a comprehension instead of per-line branching
+    parts = _SEPARATOR_RE.split(content, maxsplit=1)
+
+    categories = [line.strip() for line in parts[0].splitlines() if line.strip()]
+    moods = ([line.strip() for line in parts[1].splitlines() if line.strip()]
+             if len(parts) > 1 else [])
 
-def save_temp_file(file_content):
+    return _dedupe(categories), _dedupe(moods)
+
+def save_temp_file(file_content, suffix=''):
     """
     Save uploaded file content to a temporary file
-    
+
     Args:
         file_content (bytes): The binary content of the uploaded file
-        
+        suffix (str): Optional filename suffix (e.g. '.csv') so the
+                      extension-based format detection still works
+
     Returns:
         str: Path to the temporary file
     """
     # Create a temporary file
-    fd, temp_path = tempfile.mkstemp()
+    fd, temp_path = tempfile.mkstemp(suffix=suffix)
     
     try:
         with os.fdopen(fd, 'wb') as tmp:
@@ -15,18 +15,26 @@ sys.path.insert(0, parent_dir)
 
 from src.image_processing.analyzer import ImageAnalyzer
 
+# Analyzer instance shared across calls, so batch testing doesn't pay
+# construction cost per image
+_ANALYZER = None
+
+def _get_analyzer():
+    """Return a shared ImageAnalyzer, constructing it on first use"""
+    global _ANALYZER
+    if _ANALYZER is None:
+        _ANALYZER = ImageAnalyzer()
+    return _ANALYZER
+
 def detect_color(image_path):
     """
     Test the color detection on a single image
-    
+
     Args:
         image_path (str): Path to the image
     """
-    # Initialize the analyzer
-    analyzer = ImageAnalyzer()
-    
     # Check if image is color or black and white
-    is_color = analyzer._is_color_image(image_path)
+    is_color = _get_analyzer()._is_color_image(image_path)
     
     # Print result
     print(f"Image: {os.path.basename(image_path)}")
@@ -37,15 +45,17 @@ def detect_color(image_path):
 def main():
     """Main entry point"""
     parser = argparse.ArgumentParser(description='Test color detection')
-    parser.add_argument('image_path', help='Path to the image file')
+    parser.add_argument('image_paths', nargs='+', help='Path(s) to the image file(s)')
     args = parser.parse_args()
-    
-    if not os.path.isfile(args.image_path):
-        print(f"Error: File not found: {args.image_path}")
-        return 1
-    
-    # Detect if the image is color or black and white
-    detect_color(args.image_path)
+
+    for image_path in args.image_paths:
+        if not os.path.isfile(image_path):
+            print(f"Error: File not found: {image_path}")
+            return 1
+
+        # Detect if the image is color or black and white
+        detect_color(image_path)
+
     return 0
 
 if __name__ == "__main__":
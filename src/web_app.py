@@ -4,27 +4,21 @@ Smart Photo Organizer Web App
 Streamlit-based web interface
 """
 
+import contextlib
 import os
-import sys
 import tempfile
 import shutil
 import zipfile
-import pandas as pd
 import streamlit as st
 from pathlib import Path
 import io
-import imghdr
-import mimetypes
+import threading
 from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-# Import local modules
-from auth.google_auth import authenticate
-from drive.connector import DriveConnector
-from drive.utils import select_folder, create_output_folder
-from image_processing.analyzer import ImageAnalyzer
-from image_processing.renamer import rename_images
-from metadata.export import export_metadata
-from metadata.import_file import import_from_file, save_temp_file
+# Heavy local modules (googleapiclient, PIL, openai, pandas) are
+# imported inside the functions that need them so cold start doesn't
+# pay for features the user may never touch
 
 # Set page config
 st.set_page_config(
@@ -33,44 +27,146 @@ st.set_page_config(
     layout="wide",
 )
 
+# Concurrent analyses; OpenAI latency dominates, so threads overlap it
+MAX_ANALYSIS_WORKERS = 8
+
+# Cap on simultaneous Drive requests, separate from the analysis pool
+# so Drive quota can be throttled without starving OpenAI calls
+DRIVE_CONCURRENCY = 8
+
 # Constants for security limits
 MAX_ZIP_SIZE_MB = 200  # Maximum zip file size in MB
 MAX_IMAGE_SIZE_MB = 50  # Maximum individual image size in MB
 MAX_IMAGES_FROM_ZIP = 100  # Maximum number of images to extract from a zip
 MAX_INDIVIDUAL_UPLOADS = 50  # Maximum number of individual files to upload
 
-# File validation constants
-VALID_IMAGE_TYPES = ['jpeg', 'jpg', 'png', 'gif', 'bmp']
-VALID_IMAGE_MIME_TYPES = ['image/jpeg', 'image/png', 'image/gif', 'image/bmp']
+# Leading magic bytes of the accepted image formats; content sniffing
+# replaces the deprecated imghdr module and the extension-based
+# mimetypes double-check
+IMAGE_MAGIC_SIGNATURES = {
+    b'\xff\xd8\xff': 'jpeg',
+    b'\x89PNG\r\n\x1a\n': 'png',
+    b'GIF87a': 'gif',
+    b'GIF89a': 'gif',
+    b'BM': 'bmp',
+}
+
+
+# Accepted file extensions for zip screening; str.endswith with a
+# tuple runs the whole comparison in C
+IMAGE_SUFFIXES = ('.jpg', '.jpeg', '.png', '.gif', '.bmp')
+
+
+def _parse_lines(text):
+    """Split text-area input into stripped, non-empty lines"""
+    return [line for line in map(str.strip, text.splitlines()) if line]
+
+
+def _is_image_magic(head):
+    """Return True if the leading bytes match a supported image format"""
+    return any(head.startswith(sig) for sig in IMAGE_MAGIC_SIGNATURES)
+
+
+def _results_dataframe(renamed_images):
+    """Build the results summary DataFrame column-wise
+
+    Columnar lists hand pandas ready-made arrays instead of a dict per
+    row, avoiding O(rows x columns) small allocations.
+    """
+    import pandas as pd
+
+    columns = {
+        'Original Filename': [],
+        'New Filename': [],
+        'Short Description': [],
+        'Categories': [],
+        'Color Type': [],
+        'Mood': [],
+    }
+    for image in renamed_images:
+        metadata = image['metadata']
+        columns['Original Filename'].append(image['original_filename'])
+        columns['New Filename'].append(image['new_name'])
+        columns['Short Description'].append(metadata.short_description)
+        columns['Categories'].append(', '.join(metadata.categories))
+        columns['Color Type'].append(
+            'Color' if metadata.is_color else 'Black & White')
+        columns['Mood'].append(metadata.mood)
+    return pd.DataFrame(columns)
+
+
+@st.cache_data(show_spinner=False)
+def _parse_cat_mood(blob, suffix):
+    """Parse an uploaded categories/moods file, cached on its bytes
+
+    Reruns triggered by unrelated widgets would otherwise re-write the
+    temp file and re-parse on every interaction; the bytes key
+    auto-invalidates when a different file is uploaded.
+    """
+    from metadata.import_file import import_from_file, save_temp_file
+
+    temp_path = save_temp_file(blob, suffix=suffix)
+    try:
+        return import_from_file(temp_path)
+    finally:
+        os.unlink(temp_path)
 
 
-def validate_image_file(file_path):
-    """Validate that a file is actually an image by checking content"""
-    try:
-        # Check file size
-        file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
-        if file_size_mb > MAX_IMAGE_SIZE_MB:
-            return False, f"File exceeds maximum size of {MAX_IMAGE_SIZE_MB}MB"
-
-        # Check using imghdr to detect image type from content
-        img_type = imghdr.what(file_path)
-        if img_type is None or img_type.lower() not in VALID_IMAGE_TYPES:
-            return False, "File does not appear to be a valid image"
-
-        # Additional check with mime type
-        mime_type, _ = mimetypes.guess_type(file_path)
-        if mime_type is None or mime_type not in VALID_IMAGE_MIME_TYPES:
-            return False, "File mime type is not recognized as an image"
-
-        return True, "Valid image"
-    except Exception as e:
-        return False, f"Error validating image: {str(e)}"
+@st.cache_resource
+def get_drive():
+    """Return a cached, authenticated DriveConnector
+
+    Authentication and the HTTP pool are reused across reruns and
+    sessions instead of being rebuilt on every connect click.
+    """
+    from auth.google_auth import authenticate
+    from drive.connector import DriveConnector
+
+    return DriveConnector(authenticate())
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _list_folders(_drive):
+    """List Drive folders, cached briefly across reruns
+
+    The leading underscore tells Streamlit not to hash the client; the
+    60s TTL keeps the folder picker responsive without going stale.
+    """
+    return _drive.list_folders()
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _list_image_files(_drive, folder_id):
+    """List image files in a folder, cached briefly across reruns"""
+    return _drive.list_image_files(folder_id)
+
+
+@st.cache_resource
+def get_analyzer(custom_categories_tuple, custom_moods_tuple):
+    """Return a cached ImageAnalyzer shared across reruns and sessions
+
+    Construction opens the shelve cache and builds the prompt, which is
+    redundant work on every "Process Images" click. Tuples keep the
+    arguments hashable for Streamlit's cache key.
+    """
+    from image_processing.analyzer import ImageAnalyzer
+
+    return ImageAnalyzer(
+        custom_categories=list(custom_categories_tuple) or None,
+        custom_moods=list(custom_moods_tuple) or None
+    )
+
 
 # Configure OpenAI API key
 
 
 def configure_api_keys():
     """Configure API keys from Streamlit secrets or environment variables"""
+    # Once a key has been found for this session, skip the secrets
+    # lookup and widget rendering on every subsequent rerun
+    if st.session_state.get('api_key_configured'):
+        return True
+
     try:
         # Try to get API key from Streamlit secrets
         if 'OPENAI_API_KEY' in st.secrets:
@@ -88,11 +184,14 @@ def configure_api_keys():
                 "Enter your OpenAI API key:", type="password")
             if api_key:
                 os.environ['OPENAI_API_KEY'] = api_key
+                st.session_state.api_key_configured = True
                 st.success("API key set successfully!")
                 return True
             else:
                 st.info("Please enter your OpenAI API key to continue.")
                 return False
+
+        st.session_state.api_key_configured = True
         return True
     except Exception as e:
         st.error(f"Error configuring API keys: {str(e)}")
@@ -101,6 +200,7 @@ def configure_api_keys():
         api_key = st.text_input("Enter your OpenAI API key:", type="password")
         if api_key:
             os.environ['OPENAI_API_KEY'] = api_key
+            st.session_state.api_key_configured = True
             st.success("API key set successfully!")
             return True
         else:
@@ -108,43 +208,15 @@ def configure_api_keys():
             return False
 
 
-def main():
-    """Main entry point for the Streamlit app"""
+@st.fragment
+def sidebar_options():
+    """Render the sidebar options as an isolated fragment
 
-    st.title("Smart Photo Organizer")
-    st.subheader("Organize your photos with AI")
-
-    # App description and features
-    with st.expander("ℹ️ About this app", expanded=False):
-        st.markdown("""
-        **Smart Photo Organizer** is an AI-powered tool that analyzes your photos and helps you organize them intelligently.
-        
-        ### What this app does:
-        
-        1. **Analysis** - Uses AI to analyze your photos and extract:
-           - Short descriptive text
-           - Categories (landscape, portrait, food, architecture, etc.)
-           - Mood (calm, energetic, happy, etc.)
-           - Color detection (color vs. black & white)
-        
-        2. **Smart Renaming** - Renames your files following the format: `0001-SHORT_DESCRIPTION.jpg`
-        
-        3. **Metadata Export** - Creates an Excel/CSV file containing all the extracted information
-        
-        4. **Organized Download** - Packages all renamed files and metadata into a convenient ZIP file
-        
-        ### Privacy Note:
-        Images are analyzed using OpenAI's services (ChatGPT/GPT-4), so image data is sent to OpenAI for processing.
-        Images are temporarily stored on this server during processing and then deleted.
-        No data is permanently stored on our servers, but please be aware of OpenAI's privacy policy regarding uploaded content.
-        """)
-
-    # Configure API keys
-    if not configure_api_keys():
-        # If API key configuration failed, don't proceed further
-        return
-
-    # Sidebar for app navigation and options
+    Each keystroke in the category/mood text areas would otherwise
+    rerun the whole script; the fragment limits those reruns to this
+    block. Results land in session_state, and the button click that
+    starts processing triggers a full rerun that picks them up.
+    """
     with st.sidebar:
         st.header("Options")
         # Temporarily disable Google Drive option
@@ -156,6 +228,17 @@ def main():
         st.info(
             "Google Drive integration is temporarily disabled. Only local uploads are available.")
 
+        # Concurrency option: lets users back off when they hit OpenAI
+        # rate limits, or push higher-tier keys harder
+        st.subheader("Performance")
+        analysis_workers = st.slider(
+            "Concurrent analysis requests:",
+            min_value=1,
+            max_value=16,
+            value=MAX_ANALYSIS_WORKERS,
+            help="Lower this if you hit OpenAI rate limits; raise it for higher-tier API keys."
+        )
+
         # Export format option
         st.subheader("Export Settings")
         export_format = st.selectbox(
@@ -190,15 +273,10 @@ def main():
 
             if cat_mood_file is not None:
                 try:
-                    # Save uploaded file to a temporary file
-                    temp_path = save_temp_file(cat_mood_file.getvalue())
-
-                    # Import categories and moods
-                    custom_categories, custom_moods = import_from_file(
-                        temp_path)
-
-                    # Clean up
-                    os.unlink(temp_path)
+                    # Import categories and moods (cached on file bytes)
+                    suffix = os.path.splitext(cat_mood_file.name)[1]
+                    custom_categories, custom_moods = _parse_cat_mood(
+                        cat_mood_file.getvalue(), suffix)
 
                     st.success(
                         f"Imported {len(custom_categories)} categories and {len(custom_moods)} moods.")
@@ -229,19 +307,68 @@ def main():
             )
 
             if categories_input:
-                custom_categories = [
-                    c.strip() for c in categories_input.strip().split("\n") if c.strip()]
+                custom_categories = _parse_lines(categories_input)
 
             if moods_input:
-                custom_moods = [m.strip()
-                                for m in moods_input.strip().split("\n") if m.strip()]
+                custom_moods = _parse_lines(moods_input)
 
             if custom_categories or custom_moods:
                 st.success(
                     f"Using {len(custom_categories or [])} custom categories and {len(custom_moods or [])} custom moods.")
 
+    st.session_state.source_option = source_option
+    st.session_state.analysis_workers = analysis_workers
+    st.session_state.export_format = export_format
+    st.session_state.custom_categories = custom_categories
+    st.session_state.custom_moods = custom_moods
+
+
+def main():
+    """Main entry point for the Streamlit app"""
+
+    st.title("Smart Photo Organizer")
+    st.subheader("Organize your photos with AI")
+
+    # App description and features
+    with st.expander("ℹ️ About this app", expanded=False):
+        st.markdown("""
+        **Smart Photo Organizer** is an AI-powered tool that analyzes your photos and helps you organize them intelligently.
+        
+        ### What this app does:
+        
+        1. **Analysis** - Uses AI to analyze your photos and extract:
+           - Short descriptive text
+           - Categories (landscape, portrait, food, architecture, etc.)
+           - Mood (calm, energetic, happy, etc.)
+           - Color detection (color vs. black & white)
+        
+        2. **Smart Renaming** - Renames your files following the format: `0001-SHORT_DESCRIPTION.jpg`
+        
+        3. **Metadata Export** - Creates an Excel/CSV file containing all the extracted information
+        
+        4. **Organized Download** - Packages all renamed files and metadata into a convenient ZIP file
+        
+        ### Privacy Note:
+        Images are analyzed using OpenAI's services (ChatGPT/GPT-4), so image data is sent to OpenAI for processing.
+        Images are temporarily stored on this server during processing and then deleted.
+        No data is permanently stored on our servers, but please be aware of OpenAI's privacy policy regarding uploaded content.
+        """)
+
+    # Configure API keys
+    if not configure_api_keys():
+        # If API key configuration failed, don't proceed further
+        return
+
+    # Sidebar for app navigation and options; rendered as a fragment
+    # so typing in its widgets doesn't rerun the whole script
+    sidebar_options()
+
+    export_format = st.session_state.export_format
+    custom_categories = st.session_state.custom_categories
+    custom_moods = st.session_state.custom_moods
+
     # Main content based on selected source
-    if source_option == "Upload Local Images":
+    if st.session_state.source_option == "Upload Local Images":
         process_local_images(export_format, custom_categories, custom_moods)
     else:
         process_drive_images(export_format, custom_categories, custom_moods)
@@ -249,6 +376,9 @@ def main():
 
 def process_local_images(export_format, custom_categories, custom_moods):
     """Process locally uploaded images"""
+    from image_processing.analyzer import BATCH_SIZE
+    from image_processing.renamer import rename_images
+    from metadata.export import export_metadata
 
     st.header("Upload Your Photos")
 
@@ -269,376 +399,438 @@ def process_local_images(export_format, custom_categories, custom_moods):
     )
 
     image_paths = []
-    temp_dir = tempfile.mkdtemp()
-    invalid_files = []
-
-    if upload_type == "Individual Images":
-        # File uploader for individual images with size limit warning
-        st.warning(
-            f"Maximum file size: {MAX_IMAGE_SIZE_MB}MB per image, up to {MAX_INDIVIDUAL_UPLOADS} images")
-
-        # File uploader for individual images
-        uploaded_files = st.file_uploader(
-            "Drag & drop your photos here or click to browse",
-            type=["jpg", "jpeg", "png", "gif", "bmp"],
-            accept_multiple_files=True,
-            help="Select multiple files by holding CTRL/CMD while clicking, or by dragging a selection box over them"
-        )
-
-        if not uploaded_files:
-            st.info("Please upload one or more image files to begin.")
-            return
-
-        # Check if too many files uploaded
-        if len(uploaded_files) > MAX_INDIVIDUAL_UPLOADS:
-            st.error(
-                f"Too many files uploaded. Maximum is {MAX_INDIVIDUAL_UPLOADS}.")
-            return
-
-        # Save and validate uploaded images
-        with st.spinner("Validating uploaded images..."):
-            for uploaded_file in uploaded_files:
-                # Check file size first
-                file_size_mb = sys.getsizeof(
-                    uploaded_file.getbuffer()) / (1024 * 1024)
-                if file_size_mb > MAX_IMAGE_SIZE_MB:
-                    invalid_files.append(
-                        f"{uploaded_file.name} (exceeds {MAX_IMAGE_SIZE_MB}MB size limit)")
-                    continue
-
-                # Save to temp directory for validation
-                temp_path = os.path.join(temp_dir, uploaded_file.name)
-                with open(temp_path, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
-
-                # Validate the file is actually an image
-                is_valid, message = validate_image_file(temp_path)
-                if is_valid:
-                    image_paths.append(
-                        {"path": temp_path, "name": uploaded_file.name})
-                else:
-                    invalid_files.append(f"{uploaded_file.name} ({message})")
-                    os.remove(temp_path)  # Remove invalid file
+    # All temp files for this run live in one directory that the
+    # context manager removes when the script run ends, so nothing
+    # leaks even when the user never clicks Process
+    with tempfile.TemporaryDirectory() as temp_dir:
+        invalid_files = []
+
+        if upload_type == "Individual Images":
+            # File uploader for individual images with size limit warning
+            st.warning(
+                f"Maximum file size: {MAX_IMAGE_SIZE_MB}MB per image, up to {MAX_INDIVIDUAL_UPLOADS} images")
+
+            # File uploader for individual images
+            uploaded_files = st.file_uploader(
+                "Drag & drop your photos here or click to browse",
+                type=["jpg", "jpeg", "png", "gif", "bmp"],
+                accept_multiple_files=True,
+                help="Select multiple files by holding CTRL/CMD while clicking, or by dragging a selection box over them"
+            )
 
-    else:  # Zip Archive
-        # Display size limits
-        st.warning(
-            f"Maximum zip file size: {MAX_ZIP_SIZE_MB}MB, extracting up to {MAX_IMAGES_FROM_ZIP} images")
+            if not uploaded_files:
+                st.info("Please upload one or more image files to begin.")
+                return
 
-        # File uploader for zip file
-        uploaded_zip = st.file_uploader(
-            "Upload a ZIP archive containing your photos",
-            type=["zip"],
-            help="The app will extract and process only valid image files (JPG, PNG, GIF, BMP), ignoring all other files"
-        )
+            # Check if too many files uploaded
+            if len(uploaded_files) > MAX_INDIVIDUAL_UPLOADS:
+                st.error(
+                    f"Too many files uploaded. Maximum is {MAX_INDIVIDUAL_UPLOADS}.")
+                return
 
-        if not uploaded_zip:
-            st.info("Please upload a zip file containing images to begin.")
-            return
+            # Save and validate uploaded images
+            with st.spinner("Validating uploaded images..."):
+                for uploaded_file in uploaded_files:
+                    # Check file size first
+                    file_size_mb = uploaded_file.size / (1024 * 1024)
+                    if file_size_mb > MAX_IMAGE_SIZE_MB:
+                        invalid_files.append(
+                            f"{uploaded_file.name} (exceeds {MAX_IMAGE_SIZE_MB}MB size limit)")
+                        continue
+
+                    # Sniff the magic bytes straight from the upload's
+                    # buffer, so rejected files never touch the disk;
+                    # the memoryview slice copies only 12 bytes
+                    head = bytes(uploaded_file.getbuffer()[:12])
+                    if not _is_image_magic(head):
+                        invalid_files.append(
+                            f"{uploaded_file.name} (File does not appear to be a valid image)")
+                        continue
+
+                    # Stream valid files to the temp directory once;
+                    # keep the upload's bytes (already resident in
+                    # Streamlit's buffer) so analysis doesn't re-read
+                    # the temp file
+                    temp_path = os.path.join(temp_dir, uploaded_file.name)
+                    uploaded_file.seek(0)
+                    with open(temp_path, "wb") as f:
+                        shutil.copyfileobj(uploaded_file, f, length=1024 * 1024)
 
-        # Check zip file size
-        zip_size_mb = sys.getsizeof(uploaded_zip.getbuffer()) / (1024 * 1024)
-        if zip_size_mb > MAX_ZIP_SIZE_MB:
-            st.error(f"Zip file exceeds maximum size of {MAX_ZIP_SIZE_MB}MB")
-            return
+                    image_paths.append(
+                        {"path": temp_path, "name": uploaded_file.name,
+                         "data": uploaded_file.getvalue()})
+
+        else:  # Zip Archive
+            # Display size limits
+            st.warning(
+                f"Maximum zip file size: {MAX_ZIP_SIZE_MB}MB, extracting up to {MAX_IMAGES_FROM_ZIP} images")
+
+            # File uploader for zip file
+            uploaded_zip = st.file_uploader(
+                "Upload a ZIP archive containing your photos",
+                type=["zip"],
+                help="The app will extract and process only valid image files (JPG, PNG, GIF, BMP), ignoring all other files"
+            )
 
-        # Extract image files from zip
-        try:
-            with st.spinner("Extracting and validating images from zip file..."):
-                # Create a temporary file for the zip
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.zip') as temp_zip:
-                    temp_zip.write(uploaded_zip.getbuffer())
-                    temp_zip_path = temp_zip.name
-
-                extracted_count = 0
-                skipped_count = 0
-
-                # Process the zip file in streaming mode
-                with zipfile.ZipFile(temp_zip_path, 'r') as zip_ref:
-                    # Get list of all files in the zip
-                    file_list = zip_ref.namelist()
-
-                    # Filter to keep only files with image extensions first
-                    image_extensions = [
-                        '.jpg', '.jpeg', '.png', '.gif', '.bmp']
-                    potential_image_files = [f for f in file_list if any(
-                        f.lower().endswith(ext) for ext in image_extensions)]
-
-                    if not potential_image_files:
-                        st.error("No image files found in the zip archive.")
-                        os.remove(temp_zip_path)
-                        return
+            if not uploaded_zip:
+                st.info("Please upload a zip file containing images to begin.")
+                return
 
-                    # Check if zip contains too many potential image files
-                    # We use *2 as buffer before full extraction
-                    if len(potential_image_files) > MAX_IMAGES_FROM_ZIP * 2:
-                        st.error(
-                            f"Zip contains too many files. Maximum is {MAX_IMAGES_FROM_ZIP}.")
-                        os.remove(temp_zip_path)
-                        return
+            # Check zip file size
+            zip_size_mb = uploaded_zip.size / (1024 * 1024)
+            if zip_size_mb > MAX_ZIP_SIZE_MB:
+                st.error(f"Zip file exceeds maximum size of {MAX_ZIP_SIZE_MB}MB")
+                return
 
-                    # Extract and validate each file
-                    for img_file in potential_image_files:
-                        # Skip if we've reached the limit
-                        if extracted_count >= MAX_IMAGES_FROM_ZIP:
-                            skipped_count += 1
-                            continue
+            # Extract image files from zip
+            try:
+                with st.spinner("Extracting and validating images from zip file..."):
+                    extracted_count = 0
+                    skipped_count = 0
+
+                    # Read the central directory straight from the
+                    # in-memory upload (UploadedFile is seekable), so
+                    # malformed or over-limit archives are rejected
+                    # without ever being written to disk
+                    uploaded_zip.seek(0)
+                    with zipfile.ZipFile(uploaded_zip) as zip_ref:
+                        # Get list of all files in the zip
+                        file_list = zip_ref.namelist()
+
+                        # Filter to keep only files with image extensions first
+                        potential_image_files = [
+                            f for f in file_list
+                            if f.lower().endswith(IMAGE_SUFFIXES)]
+
+                        if not potential_image_files:
+                            st.error("No image files found in the zip archive.")
+                            return
 
-                        # Skip directories
-                        if img_file.endswith('/'):
-                            continue
+                        # Check if zip contains too many potential image files
+                        # We use *2 as buffer before full extraction
+                        if len(potential_image_files) > MAX_IMAGES_FROM_ZIP * 2:
+                            st.error(
+                                f"Zip contains too many files. Maximum is {MAX_IMAGES_FROM_ZIP}.")
+                            return
 
-                        filename = os.path.basename(img_file)
-                        if not filename:  # Skip if empty filename
-                            continue
+                        # Cheap checks first, against the central
+                        # directory only: limits, directories, sizes
+                        # and path traversal
+                        to_extract = []
+                        seen_names = set()
+                        for img_file in potential_image_files:
+                            # Skip directories
+                            if img_file.endswith('/'):
+                                continue
 
-                        try:
-                            # Extract the file to temporary location
-                            temp_path = os.path.join(temp_dir, filename)
+                            filename = os.path.basename(img_file)
+                            if not filename:  # Skip if empty filename
+                                continue
 
-                            # Get file info to check size before extraction
-                            file_info = zip_ref.getinfo(img_file)
-                            file_size_mb = file_info.file_size / (1024 * 1024)
+                            # Skip if we've reached the limit
+                            if len(to_extract) >= MAX_IMAGES_FROM_ZIP:
+                                skipped_count += 1
+                                continue
 
                             # Skip if file is too large
-                            if file_size_mb > MAX_IMAGE_SIZE_MB:
+                            file_info = zip_ref.getinfo(img_file)
+                            if file_info.file_size > MAX_IMAGE_SIZE_MB * 1024 * 1024:
                                 invalid_files.append(
                                     f"{filename} (exceeds {MAX_IMAGE_SIZE_MB}MB size limit)")
                                 continue
 
                             # Check for zip path traversal vulnerability
-                            if os.path.isabs(filename) or '..' in filename:
+                            if (os.path.isabs(filename)
+                                    or '..' in filename.split('/')):
                                 invalid_files.append(
                                     f"{img_file} (invalid path)")
                                 continue
 
-                            # Extract file safely
-                            with zip_ref.open(img_file) as source, open(temp_path, 'wb') as target:
-                                shutil.copyfileobj(source, target)
+                            # Duplicate basenames would race for the
+                            # same temp path under parallel extraction
+                            if filename in seen_names:
+                                invalid_files.append(
+                                    f"{img_file} (duplicate filename)")
+                                continue
+                            seen_names.add(filename)
+
+                            to_extract.append((img_file, filename))
 
-                            # Validate the file is actually an image
-                            is_valid, message = validate_image_file(temp_path)
-                            if is_valid:
-                                image_paths.append(
-                                    {"path": temp_path, "name": filename})
-                                extracted_count += 1
-                            else:
-                                invalid_files.append(f"{filename} ({message})")
-                                os.remove(temp_path)  # Remove invalid file
+                    def _extract_one(entry):
+                        """Sniff and extract one zip entry to temp_dir
 
+                        Each worker opens its own ZipFile handle, so
+                        reads don't contend on a shared file object.
+                        """
+                        img_file, filename = entry
+                        temp_path = os.path.join(temp_dir, filename)
+                        try:
+                            with zipfile.ZipFile(temp_zip_path) as zf, \
+                                    zf.open(img_file) as source:
+                                head = source.read(12)
+                                if not _is_image_magic(head):
+                                    return None, f"{filename} (File does not appear to be a valid image)"
+
+                                with open(temp_path, 'wb') as target:
+                                    target.write(head)
+                                    shutil.copyfileobj(source, target,
+                                                       length=1024 * 1024)
+
+                            return {"path": temp_path, "name": filename}, None
                         except Exception as e:
-                            invalid_files.append(
-                                f"{img_file} (error: {str(e)})")
-                            # Clean up if needed
-                            if os.path.exists(temp_path):
+                            # One unlink instead of the racy stat +
+                            # remove pair
+                            with contextlib.suppress(FileNotFoundError):
                                 os.remove(temp_path)
+                            return None, f"{img_file} (error: {str(e)})"
+
+                    # Decompress and write entries in parallel; the
+                    # work is I/O plus zlib, both of which release
+                    # the GIL. The archive is spooled to disk once,
+                    # only when something passed validation, so each
+                    # worker can open its own cheap file-backed handle
+                    if to_extract:
+                        with tempfile.NamedTemporaryFile(
+                                delete=False, suffix='.zip') as temp_zip:
+                            uploaded_zip.seek(0)
+                            shutil.copyfileobj(uploaded_zip, temp_zip,
+                                               length=1024 * 1024)
+                            temp_zip_path = temp_zip.name
 
-                # Clean up the temporary zip file
-                os.remove(temp_zip_path)
+                        try:
+                            with ThreadPoolExecutor(
+                                    max_workers=min(8, len(to_extract))) as executor:
+                                for extracted, error in executor.map(
+                                        _extract_one, to_extract):
+                                    if extracted is not None:
+                                        image_paths.append(extracted)
+                                        extracted_count += 1
+                                    else:
+                                        invalid_files.append(error)
+                        finally:
+                            # Clean up the temporary zip file
+                            os.remove(temp_zip_path)
 
-                # Report results
-                if extracted_count > 0:
-                    st.success(
-                        f"Extracted {extracted_count} valid image files from the zip archive.")
-                    if skipped_count > 0:
-                        st.warning(
-                            f"Skipped {skipped_count} files due to limit of {MAX_IMAGES_FROM_ZIP} images.")
-                else:
-                    st.error("No valid image files found in the zip archive.")
-                    return
+                    # Report results
+                    if extracted_count > 0:
+                        st.success(
+                            f"Extracted {extracted_count} valid image files from the zip archive.")
+                        if skipped_count > 0:
+                            st.warning(
+                                f"Skipped {skipped_count} files due to limit of {MAX_IMAGES_FROM_ZIP} images.")
+                    else:
+                        st.error("No valid image files found in the zip archive.")
+                        return
 
-        except zipfile.BadZipFile:
-            st.error("The uploaded file is not a valid zip archive.")
-            return
-        except Exception as e:
-            st.error(f"Error extracting zip file: {str(e)}")
-            return
+            except zipfile.BadZipFile:
+                st.error("The uploaded file is not a valid zip archive.")
+                return
+            except Exception as e:
+                st.error(f"Error extracting zip file: {str(e)}")
+                return
 
-    # Display invalid files if any
-    if invalid_files:
-        with st.expander(f"⚠️ {len(invalid_files)} files were skipped", expanded=True):
-            for invalid_file in invalid_files:
-                st.warning(invalid_file)
+        # Display invalid files if any
+        if invalid_files:
+            with st.expander(f"⚠️ {len(invalid_files)} files were skipped", expanded=True):
+                for invalid_file in invalid_files:
+                    st.warning(invalid_file)
 
-    # Create a button to process the images
-    if image_paths:
-        st.info(f"Ready to process {len(image_paths)} images")
+        # Create a button to process the images
+        if image_paths:
+            st.info(f"Ready to process {len(image_paths)} images")
 
-        # Show preview of what will happen
-        with st.expander("What happens when you process the images?"):
-            st.markdown("""
-            When you click "Process Images":
+            # Show preview of what will happen
+            with st.expander("What happens when you process the images?"):
+                st.markdown("""
+                When you click "Process Images":
             
-            1. **AI Analysis**: Each image is analyzed to extract:
-               - A short description of the image content
-               - Relevant categories (e.g., landscape, portrait, food)
-               - The overall mood of the image
-               - Whether the image is color or black & white
+                1. **AI Analysis**: Each image is analyzed to extract:
+                   - A short description of the image content
+                   - Relevant categories (e.g., landscape, portrait, food)
+                   - The overall mood of the image
+                   - Whether the image is color or black & white
                
-            2. **Smart Renaming**: Files are renamed to a format like `0001-SUNSET_AT_BEACH.jpg`
+                2. **Smart Renaming**: Files are renamed to a format like `0001-SUNSET_AT_BEACH.jpg`
             
-            3. **Metadata Export**: All information is compiled into an Excel/CSV file
+                3. **Metadata Export**: All information is compiled into an Excel/CSV file
             
-            4. **ZIP Package**: All processed files are packaged into a downloadable ZIP file
-            """)
+                4. **ZIP Package**: All processed files are packaged into a downloadable ZIP file
+                """)
 
-        process_button = st.button(
-            "🔍 Process Images", type="primary", use_container_width=True)
+            process_button = st.button(
+                "🔍 Process Images", type="primary", use_container_width=True)
 
-        if process_button:
-            if not image_paths:
-                st.error("No valid images to process. Please upload images first.")
-                return
-
-            with st.spinner("Processing images..."):
-                output_dir = tempfile.mkdtemp()
+            if process_button:
+                if not image_paths:
+                    st.error("No valid images to process. Please upload images first.")
+                    return
 
-                try:
-                    # Initialize image analyzer
-                    analyzer = ImageAnalyzer(
-                        custom_categories=custom_categories,
-                        custom_moods=custom_moods
-                    )
+                with st.spinner("Processing images..."):
+                    try:
+                        # Initialize image analyzer (cached across reruns)
+                        analyzer = get_analyzer(
+                            tuple(custom_categories or ()),
+                            tuple(custom_moods or ())
+                        )
 
-                    # Process images with improved error handling
-                    processed_images = []
-                    failed_images = []
+                        # Process images concurrently: each analysis mostly
+                        # waits on the OpenAI API, so threads overlap them
+                        processed_by_index = {}
+                        failed_images = []
 
-                    progress_bar = st.progress(0)
-                    status_text = st.empty()
+                        progress_bar = st.progress(0)
+                        status_text = st.empty()
+                        status_text.text(
+                            f"Analyzing {len(image_paths)} images...")
+
+                        # Submit batches of BATCH_SIZE images per Vision
+                        # call, several batches in flight at once.
+                        # Progress updates are throttled to ~20 ticks:
+                        # every st.progress call is a websocket
+                        # round-trip to the browser
+                        completed = 0
+                        last_shown = 0
+                        update_every = max(1, len(image_paths) // 20)
+                        chunks = [
+                            list(range(start,
+                                       min(start + BATCH_SIZE, len(image_paths))))
+                            for start in range(0, len(image_paths), BATCH_SIZE)
+                        ]
+                        workers = min(
+                            st.session_state.get('analysis_workers',
+                                                 MAX_ANALYSIS_WORKERS),
+                            len(chunks))
+                        with ThreadPoolExecutor(max_workers=workers) as executor:
+                            futures = {
+                                executor.submit(
+                                    analyzer.analyze_batch,
+                                    [(image_paths[i].get('data',
+                                                         image_paths[i]['path']),
+                                      image_paths[i]['name']) for i in indices]
+                                ): indices
+                                for indices in chunks
+                            }
+                            for future in as_completed(futures):
+                                indices = futures[future]
+                                try:
+                                    metadatas = future.result()
+
+                                    # Add to processed list
+                                    for i, metadata in zip(indices, metadatas):
+                                        image = image_paths[i]
+                                        processed_by_index[i] = {
+                                            'original_file': {'name': image['name']},
+                                            'temp_path': image['path'],
+                                            'metadata': metadata
+                                        }
+                                except Exception as e:
+                                    for i in indices:
+                                        failed_images.append(
+                                            f"{image_paths[i]['name']} (error: {str(e)})")
+                                finally:
+                                    # Update progress even if a batch fails
+                                    completed += len(indices)
+                                    if (completed - last_shown >= update_every
+                                            or completed == len(image_paths)):
+                                        progress_bar.progress(
+                                            completed / len(image_paths))
+                                        last_shown = completed
+
+                        # Keep the upload order so numbering stays stable
+                        processed_images = [
+                            processed_by_index[i]
+                            for i in sorted(processed_by_index)
+                        ]
+
+                        # If no images were processed successfully
+                        if not processed_images:
+                            st.error(
+                                "All images failed processing. Please try different images.")
+                            # Display errors
+                            if failed_images:
+                                with st.expander("Processing errors", expanded=True):
+                                    for failed in failed_images:
+                                        st.error(failed)
+                            return
 
-                    for i, image in enumerate(image_paths):
-                        status_text.text(f"Processing {image['name']}...")
-                        try:
-                            # Analyze image
-                            metadata = analyzer.analyze(
-                                image['path'], image['name'])
-
-                            # Add to processed list
-                            processed_images.append({
-                                'original_file': {'name': image['name']},
-                                'temp_path': image['path'],
-                                'metadata': metadata
-                            })
-                        except Exception as e:
-                            failed_images.append(
-                                f"{image['name']} (error: {str(e)})")
-                            continue
-                        finally:
-                            # Update progress even if image fails
-                            progress_bar.progress((i + 1) / len(image_paths))
-
-                    # If no images were processed successfully
-                    if not processed_images:
-                        st.error(
-                            "All images failed processing. Please try different images.")
-                        # Display errors
+                        # Display any failed images
                         if failed_images:
-                            with st.expander("Processing errors", expanded=True):
+                            with st.expander(f"{len(failed_images)} images failed processing", expanded=True):
                                 for failed in failed_images:
                                     st.error(failed)
-                        return
 
-                    # Display any failed images
-                    if failed_images:
-                        with st.expander(f"{len(failed_images)} images failed processing", expanded=True):
-                            for failed in failed_images:
-                                st.error(failed)
-
-                    # Rename images based on metadata
-                    status_text.text("Renaming images...")
-                    renamed_images = rename_images(processed_images)
-
-                    # Copy renamed images to output directory
-                    for image in renamed_images:
-                        output_path = os.path.join(
-                            output_dir, image['new_name'])
-                        shutil.copy2(image['temp_path'], output_path)
-
-                    # Export metadata
-                    status_text.text("Exporting metadata...")
-                    metadata_file = export_metadata(
-                        renamed_images, export_format)
-
-                    # Copy metadata file to output directory
-                    shutil.copy2(metadata_file, output_dir)
-
-                    # Create a zip file with all the processed files
-                    zip_path = os.path.join(temp_dir, "processed_images.zip")
-                    with zipfile.ZipFile(zip_path, 'w') as zipf:
-                        for root, _, files in os.walk(output_dir):
-                            for file in files:
-                                file_path = os.path.join(root, file)
-                                arcname = os.path.relpath(
-                                    file_path, output_dir)
-                                zipf.write(file_path, arcname)
-
-                    # Clean up temporary metadata file
-                    if os.path.exists(metadata_file):
-                        os.remove(metadata_file)
-
-                    # Display the results
-                    st.success(
-                        f"Successfully processed {len(renamed_images)} images!")
+                        # Rename images based on metadata
+                        status_text.text("Renaming images...")
+                        renamed_images = rename_images(processed_images)
+
+                        # Export metadata straight into memory; the
+                        # bytes drop into the zip without touching disk
+                        status_text.text("Exporting metadata...")
+                        metadata_name, metadata_bytes = export_metadata(
+                            renamed_images, export_format)
+
+                        # Build the zip in memory, directly from the
+                        # already-extracted temp files under their new
+                        # names; copying each image into an output
+                        # directory and zipping from disk would read and
+                        # write every byte twice more. JPEG/PNG data
+                        # doesn't compress further, so store entries
+                        # uncompressed
+                        zip_buffer = io.BytesIO()
+                        with zipfile.ZipFile(zip_buffer, 'w',
+                                             zipfile.ZIP_STORED) as zipf:
+                            for image in renamed_images:
+                                zipf.write(image['temp_path'],
+                                           arcname=image['new_name'])
+                            zipf.writestr(metadata_name, metadata_bytes)
+                        zip_buffer.seek(0)
+
+                        # Display the results
+                        st.success(
+                            f"Successfully processed {len(renamed_images)} images!")
 
-                    # Provide download details
-                    st.markdown("""
-                    ### Your processed images are ready!
+                        # Provide download details
+                        st.markdown("""
+                        ### Your processed images are ready!
                     
-                    The ZIP file contains:
-                    - All your images renamed based on their content
-                    - An Excel/CSV file with detailed metadata for each image
+                        The ZIP file contains:
+                        - All your images renamed based on their content
+                        - An Excel/CSV file with detailed metadata for each image
                     
-                    You can use this metadata to:
-                    - Sort images by category, mood, or color type
-                    - Search for specific image content
-                    - Group similar images together
-                    """)
-
-                    # Offer the zip file for download with a more prominent button
-                    with open(zip_path, "rb") as f:
+                        You can use this metadata to:
+                        - Sort images by category, mood, or color type
+                        - Search for specific image content
+                        - Group similar images together
+                        """)
+
+                        # Offer the zip file for download with a more prominent button
                         st.download_button(
                             label="📦 Download Processed Images and Metadata",
-                            data=f,
+                            data=zip_buffer,
                             file_name="processed_images.zip",
                             mime="application/zip",
                             use_container_width=True
                         )
 
-                    # Show a table of the processed images with more context
-                    st.subheader("Metadata Summary")
-                    st.markdown(
-                        "Below is a summary of the analysis for each processed image:")
-
-                    # Show a table of the processed images
-                    results_df = pd.DataFrame([
-                        {
-                            'Original Filename': image['original_filename'],
-                            'New Filename': image['new_name'],
-                            'Short Description': image['metadata'].short_description,
-                            'Categories': ', '.join(image['metadata'].categories),
-                            'Color Type': 'Color' if image['metadata'].is_color else 'Black & White',
-                            'Mood': image['metadata'].mood
-                        }
-                        for image in renamed_images
-                    ])
-
-                    st.dataframe(results_df)
+                        # Show a table of the processed images with more context
+                        st.subheader("Metadata Summary")
+                        st.markdown(
+                            "Below is a summary of the analysis for each processed image:")
 
-                except Exception as e:
-                    st.error(f"Error processing images: {str(e)}")
+                        # Show a table of the processed images
+                        results_df = _results_dataframe(renamed_images)
 
-                finally:
-                    # Clean up
-                    try:
-                        shutil.rmtree(temp_dir)
-                        shutil.rmtree(output_dir)
-                    except:
-                        pass
+                        st.dataframe(results_df, use_container_width=True)
+
+                    except Exception as e:
+                        st.error(f"Error processing images: {str(e)}")
 
 
 def process_drive_images(export_format, custom_categories, custom_moods):
     """Process images from Google Drive"""
+    from drive.utils import create_output_folder
+    from image_processing.renamer import rename_image
+    from metadata.export import export_metadata
 
     st.header("Connect to Google Drive")
 
@@ -671,13 +863,9 @@ def process_drive_images(export_format, custom_categories, custom_moods):
     if st.button("Connect to Google Drive"):
         try:
             with st.spinner("Authenticating with Google Drive..."):
-                # Authenticate with Google Drive
-                credentials = authenticate()
-
-                # Create Drive connector
-                drive = DriveConnector(credentials)
-
-                st.session_state.drive = drive
+                # Authenticate and build the connector (cached across
+                # reruns and sessions)
+                st.session_state.drive = get_drive()
                 st.success("Successfully connected to Google Drive!")
                 st.rerun()  # Rerun the app to update the UI
 
@@ -690,21 +878,26 @@ def process_drive_images(export_format, custom_categories, custom_moods):
 
         st.subheader("Select Folder")
 
-        # Get top-level folders
+        # Get top-level folders (cached with a short TTL so widget
+        # interactions don't trigger a network round-trip)
         try:
-            folders = drive.list_folders()
+            folders = _list_folders(drive)
 
             if not folders:
                 st.warning("No folders found in your Google Drive.")
                 return
 
-            folder_names = [
-                f"{folder['name']} ({folder['id']})" for folder in folders]
+            # Map display labels back to ids; a dict lookup is O(1) and
+            # doesn't break on folder names containing parentheses
+            folder_map = {
+                f"{folder['name']} ({folder['id']})": folder['id']
+                for folder in folders
+            }
             selected_folder = st.selectbox(
-                "Select a folder to process:", folder_names)
+                "Select a folder to process:", list(folder_map))
 
             # Get the folder ID from the selected folder
-            folder_id = selected_folder.split("(")[-1].strip(")")
+            folder_id = folder_map[selected_folder]
 
             # Output folder name
             output_folder_name = st.text_input(
@@ -718,7 +911,26 @@ def process_drive_images(export_format, custom_categories, custom_moods):
                             drive, output_folder_name)
 
                         # List image files in the input folder
-                        image_files = drive.list_image_files(folder_id)
+                        image_files = _list_image_files(drive, folder_id)
+
+                        # Screen oversized files from the listing
+                        # metadata before paying for any download; the
+                        # mime filtering already happened server-side
+                        # in the listing query
+                        max_bytes = MAX_IMAGE_SIZE_MB * 1024 * 1024
+                        oversized = [
+                            f for f in image_files
+                            if int(f.get('size', 0)) > max_bytes
+                        ]
+                        if oversized:
+                            st.warning(
+                                f"Skipping {len(oversized)} files over "
+                                f"{MAX_IMAGE_SIZE_MB}MB: "
+                                + ', '.join(f['name'] for f in oversized))
+                            image_files = [
+                                f for f in image_files
+                                if f not in oversized
+                            ]
 
                         if not image_files:
                             st.warning(
@@ -727,90 +939,109 @@ def process_drive_images(export_format, custom_categories, custom_moods):
 
                         st.info(f"Found {len(image_files)} image files.")
 
-                        # Initialize image analyzer
-                        analyzer = ImageAnalyzer(
-                            custom_categories=custom_categories,
-                            custom_moods=custom_moods
+                        # Initialize image analyzer (cached across reruns)
+                        analyzer = get_analyzer(
+                            tuple(custom_categories or ()),
+                            tuple(custom_moods or ())
                         )
 
-                        # Process images
-                        processed_images = []
-
+                        # Download and analyze concurrently; both steps
+                        # are network-bound so threads overlap them
                         progress_bar = st.progress(0)
                         status_text = st.empty()
-
-                        for i, image in enumerate(image_files):
-                            status_text.text(f"Processing {image['name']}...")
-
-                            # Download image to temporary location
-                            temp_path = drive.download_file(image['id'])
-
-                            # Analyze image
-                            metadata = analyzer.analyze(
-                                temp_path, image['name'])
-
-                            # Add to processed list
-                            processed_images.append({
+                        status_text.text(
+                            f"Processing {len(image_files)} images...")
+
+                        drive_semaphore = threading.Semaphore(
+                            DRIVE_CONCURRENCY)
+
+                        def process_one(index, image):
+                            """Analyze, rename and server-side copy a
+                            single image"""
+                            # Drive's md5Checksum from the listing can
+                            # satisfy the analysis from cache, in
+                            # which case no bytes are downloaded
+                            checksum = image.get('md5Checksum')
+                            metadata = (
+                                analyzer.cached_metadata(
+                                    checksum, image['name'])
+                                if checksum else None)
+                            if metadata is None:
+                                with drive_semaphore:
+                                    data = drive.download_file_bytes(
+                                        image['id'])
+                                metadata = analyzer.analyze(
+                                    data, image['name'])
+                                if checksum:
+                                    analyzer.remember_checksum(
+                                        checksum, metadata)
+
+                            # The listing position fixes the 0001-
+                            # prefix up front, so renaming and the
+                            # server-side copy happen right here
+                            # instead of in later serial phases
+                            entry = rename_image({
                                 'original_file': image,
-                                'temp_path': temp_path,
                                 'metadata': metadata
-                            })
-
-                            # Update progress
-                            progress_bar.progress((i + 1) / len(image_files))
-
-                        # Rename images based on metadata
-                        status_text.text("Renaming images...")
-                        renamed_images = rename_images(processed_images)
-
-                        # Upload renamed images to output folder
-                        status_text.text("Uploading renamed images...")
-                        for image in renamed_images:
-                            drive.upload_file(
-                                image['temp_path'],
-                                image['new_name'],
-                                output_folder_id
-                            )
-
-                            # Clean up temporary file
-                            if os.path.exists(image['temp_path']):
-                                os.remove(image['temp_path'])
-
-                        # Export metadata
+                            }, index + 1)
+                            with drive_semaphore:
+                                drive.copy_file(
+                                    image['id'],
+                                    entry['new_name'],
+                                    output_folder_id
+                                )
+                            return entry
+
+                        processed_by_index = {}
+                        completed = 0
+                        last_shown = 0
+                        update_every = max(1, len(image_files) // 20)
+                        workers = min(
+                            st.session_state.get('analysis_workers',
+                                                 MAX_ANALYSIS_WORKERS),
+                            len(image_files))
+                        with ThreadPoolExecutor(max_workers=workers) as executor:
+                            futures = {
+                                executor.submit(process_one, i, image): i
+                                for i, image in enumerate(image_files)
+                            }
+                            for future in as_completed(futures):
+                                processed_by_index[futures[future]] = future.result()
+                                completed += 1
+                                if (completed - last_shown >= update_every
+                                        or completed == len(image_files)):
+                                    progress_bar.progress(
+                                        completed / len(image_files))
+                                    last_shown = completed
+
+                        # Keep the listing order so the metadata export
+                        # matches the numbering
+                        renamed_images = [
+                            processed_by_index[i]
+                            for i in sorted(processed_by_index)
+                        ]
+
+                        # Export metadata in memory and upload it
+                        # straight from the buffer
                         status_text.text("Exporting metadata...")
-                        metadata_file = export_metadata(
+                        metadata_name, metadata_bytes = export_metadata(
                             renamed_images, export_format)
 
-                        # Upload metadata file to output folder
-                        drive.upload_file(
-                            metadata_file,
-                            os.path.basename(metadata_file),
+                        drive.upload_file_bytes(
+                            metadata_bytes,
+                            metadata_name,
                             output_folder_id
                         )
 
-                        # Clean up metadata file
-                        if os.path.exists(metadata_file):
-                            os.remove(metadata_file)
-
                         st.success(
                             f"Successfully processed {len(renamed_images)} images!")
                         st.info(
                             f"Processed images and metadata saved to '{output_folder_name}' folder in Google Drive")
 
                         # Show a table of the processed images
-                        results_df = pd.DataFrame([
-                            {
-                                'Original Filename': image['original_filename'],
-                                'New Filename': image['new_name'],
-                                'Short Description': image['metadata'].short_description,
-                                'Categories': ', '.join(image['metadata'].categories),
-                                'Color Type': 'Color' if image['metadata'].is_color else 'Black & White',
-                                'Mood': image['metadata'].mood
-                            }
-                            for image in renamed_images
-                        ])
+                        results_df = _results_dataframe(renamed_images)
 
-                        st.dataframe(results_df)
+                        st.dataframe(results_df, use_container_width=True)
 
                     except Exception as e:
                         st.error(f"Error processing images: {str(e)}")
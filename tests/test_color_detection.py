@@ -0,0 +1,51 @@
+"""
+Tests for the color/black-and-white detection in ImageAnalyzer
+"""
+
+import unittest
+import sys
+import os
+import io
+
+import numpy as np
+from PIL import Image
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# The analyzer requires an API key at construction time
+os.environ.setdefault('OPENAI_API_KEY', 'test-key')
+
+from src.image_processing.analyzer import ImageAnalyzer
+
+class TestColorDetection(unittest.TestCase):
+    """Test that _is_color_image classifies images correctly"""
+
+    def setUp(self):
+        self.analyzer = ImageAnalyzer(cache_path=None)
+
+    def test_grayscale_image(self):
+        """A uniform gray image is classified as black and white"""
+        img = Image.new('RGB', (100, 100), (120, 120, 120))
+        self.assertFalse(self.analyzer._is_color_image(img))
+
+    def test_grayscale_gradient(self):
+        """A grayscale gradient is classified as black and white"""
+        gradient = np.tile(np.arange(100, dtype=np.uint8), (100, 1))
+        img = Image.fromarray(np.stack([gradient] * 3, axis=-1))
+        self.assertFalse(self.analyzer._is_color_image(img))
+
+    def test_color_image(self):
+        """A saturated image is classified as color"""
+        img = Image.new('RGB', (100, 100), (200, 30, 30))
+        self.assertTrue(self.analyzer._is_color_image(img))
+
+    def test_accepts_raw_bytes(self):
+        """Raw encoded bytes are accepted as input"""
+        img = Image.new('RGB', (100, 100), (200, 30, 30))
+        buffer = io.BytesIO()
+        img.save(buffer, 'PNG')
+        self.assertTrue(self.analyzer._is_color_image(buffer.getvalue()))
+
+if __name__ == "__main__":
+    unittest.main()